@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import os, sys, time, random, sqlite3, tempfile, tracemalloc, statistics, platform
+from typing import Callable, Iterator
+from model_sqlite import Database, Table, PrimaryKey, Indexed
+
+
+class Record:
+    id: int | PrimaryKey = None
+    name: str = ""
+    value: int | Indexed = 0
+    score: float = 0.0
+    active: int = 1
+
+    def __init__(self, number: int) -> None:
+        self.name = f"record {number}"
+        self.value = number % 1000
+        self.score = number / 7
+        self.active = number % 2
+
+
+class WideRecord:
+    id: int | PrimaryKey = None
+    name: str = ""
+    value: int | Indexed = 0
+    settings: dict = {}
+    metadata: dict = {}
+    history: list = []
+    tags: list[str] = []
+    permissions: dict = {}
+    counters: dict = {}
+
+    def __init__(self, number: int) -> None:
+        self.name = f"record {number}"
+        self.value = number % 1000
+        self.settings = {f"option_{i}": i * number for i in range(10)}
+        self.metadata = {"created": number, "source": "benchmark", "nested": {"depth": [1, 2, 3], "flag": True}}
+        self.history = [{"step": i, "value": number + i} for i in range(5)]
+        self.tags = [f"tag {i}" for i in range(number % 5)]
+        self.permissions = {"read": True, "write": number % 3 == 0, "groups": ["a", "b"]}
+        self.counters = {"views": number, "likes": number // 2}
+
+
+MODELS: dict[str, type] = {"narrow": Record, "wide": WideRecord}
+
+
+class Result:
+    def __init__(self, case: str, model: str, size: int, runs: list[list[tuple[float, int]]], peak_memory: int | None) -> None:
+        self.case: str = case
+        self.model: str = model
+        self.size: int = size
+        self.rows: int = sum(rows for _, rows in runs[0])
+        latencies: list[float] = sorted(duration for run in runs for duration, _ in run)
+        self.operations: int = len(runs[0])
+        self.total: float = statistics.median(sum(duration for duration, _ in run) for run in runs)
+        self.throughput: float = self.rows / self.total if self.total > 0 else float("inf")
+        self.p50: float = percentile(latencies, 50)
+        self.p95: float = percentile(latencies, 95)
+        self.p99: float = percentile(latencies, 99)
+        self.peak_memory: int | None = peak_memory
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}[{self.model}]@{self.size}"
+
+    def to_dict(self) -> dict:
+        return {"case": self.case, "model": self.model, "size": self.size, "rows": self.rows, "operations": self.operations, "total": self.total, "throughput": self.throughput, "p50": self.p50, "p95": self.p95, "p99": self.p99, "peak_memory": self.peak_memory}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    index: float = (len(values) - 1) * percent / 100
+    lower: int = int(index)
+    upper: int = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (index - lower)
+
+
+def populate(table: Table, model: type, size: int) -> None:
+    table.INSERT_MANY((model(i) for i in range(size)), chunk_size=10000)
+
+
+def insert(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    for i in range(min(size, 10000)):
+        yield lambda i=i: table.INSERT(model(i)), 1
+
+
+def insert_many(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    yield lambda: populate(table, model, size), size
+
+
+def to_list(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    populate(table, model, size)
+    yield lambda: table.SELECT().TO_LIST(), size
+
+
+def where(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    populate(table, model, size)
+    values: random.Random = random.Random(size)
+    for _ in range(min(size, 1000)):
+        value: int = values.randrange(1000)
+        yield lambda value=value: table.SELECT().WHERE().COLUMN("value").EQUALS().VALUE(value).AND().COLUMN("id").GREATER_THAN().VALUE(0).LIMIT(10).TO_LIST(), 1
+
+
+def save_changes(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    populate(table, model, size)
+    rows: list = table.SELECT().TO_LIST()
+    for row in rows:
+        row.value += 1
+        if "settings" in row:
+            row.settings["changed"] = True
+    yield table.save_changes, size
+
+
+def delete(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    populate(table, model, size)
+    for start in range(0, 1000, 100):
+        yield lambda start=start: table.SELECT().WHERE().COLUMN("value").GREATER_THAN().VALUE(start - 1).AND().COLUMN("value").LESS_THAN().VALUE(start + 100).DELETE(), sum(len(range(value, size, 1000)) for value in range(start, start + 100))
+
+
+def schema_sync(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    populate(table, model, size)
+    for _ in range(10):
+        yield lambda: Table(table.__database__, table.name, model), 1
+
+
+def schema_sync_cold(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    populate(table, model, size)
+    for _ in range(10):
+        yield lambda: reopen(table.__database__.filepath, table.name, model), 1
+
+
+def schema_sync_changed(table: Table, model: type, size: int) -> Iterator[tuple[Callable[[], object], int]]:
+    populate(table, model, size)
+    changed: type = type(model.__name__, (), {**{k: v for k, v in vars(model).items() if k in model.__annotations__}, "__annotations__": {**model.__annotations__, "extra": "int"}, "extra": 0})
+    for i in range(10):
+        yield lambda i=i: Table(table.__database__, table.name, changed if i % 2 == 0 else model), size
+
+
+def reopen(filepath: str, name: str, model: type) -> None:
+    database: Database = Database(filepath)
+    try:
+        Table(database, name, model)
+    finally:
+        database.close()
+
+
+CASES: dict[str, Callable[[Table, type, int], Iterator[tuple[Callable[[], object], int]]]] = {
+    "insert": insert,
+    "insert_many": insert_many,
+    "to_list": to_list,
+    "where": where,
+    "save_changes": save_changes,
+    "delete": delete,
+    "schema_sync": schema_sync,
+    "schema_sync_cold": schema_sync_cold,
+    "schema_sync_changed": schema_sync_changed,
+}
+
+
+def run_case(case: str, model: str, size: int, profile: str = "default") -> list[tuple[float, int]]:
+    with tempfile.TemporaryDirectory() as directory:
+        database: Database = Database(os.path.join(directory, "benchmark.db"), profile=profile)
+        table: Table = Table(database, "records", MODELS[model])
+        measurements: list[tuple[float, int]] = []
+        try:
+            for operation, rows in CASES[case](table, MODELS[model], size):
+                start: float = time.perf_counter()
+                operation()
+                measurements.append((time.perf_counter() - start, rows))
+        finally:
+            database.close()
+        return measurements
+
+
+def trace_case(case: str, model: str, size: int, profile: str = "default") -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        database: Database = Database(os.path.join(directory, "benchmark.db"), profile=profile)
+        table: Table = Table(database, "records", MODELS[model])
+        peak: int = 0
+        tracemalloc.start()
+        try:
+            for operation, _ in CASES[case](table, MODELS[model], size):
+                tracemalloc.reset_peak()
+                baseline: int = tracemalloc.get_traced_memory()[0]
+                operation()
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+            database.close()
+        return peak
+
+
+def run(cases: list[str], models: list[str], sizes: list[int], repeat: int = 3, profile: str = "default", memory: bool = True, progress: Callable[[str], None] = None) -> list[Result]:
+    results: list[Result] = []
+    for size in sizes:
+        for case in cases:
+            for model in models:
+                if progress:
+                    progress(f"{case}[{model}]@{size}")
+                runs: list[list[tuple[float, int]]] = [run_case(case, model, size, profile) for _ in range(repeat)]
+                peak_memory: int | None = trace_case(case, model, size, profile) if memory else None
+                results.append(Result(case, model, size, runs, peak_memory))
+    return results
+
+
+def environment() -> dict[str, str]:
+    return {"python": sys.version.split()[0], "sqlite": sqlite3.sqlite_version, "platform": platform.platform(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import sys, json, argparse
+from benchmarks import CASES, MODELS, Result, run, environment
+
+
+def main(arguments: list[str] = None) -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark model-sqlite operations")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma separated row counts (default: %(default)s)")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma separated cases (default: %(default)s)")
+    parser.add_argument("--models", default=",".join(MODELS), help="comma separated models (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (default: %(default)s)")
+    parser.add_argument("--profile", default="default", help="Database PRAGMA profile (default: %(default)s)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run that measures peak memory")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare throughput against a previous JSON results file")
+    options: argparse.Namespace = parser.parse_args(arguments)
+    cases: list[str] = options.cases.split(",")
+    models: list[str] = options.models.split(",")
+    for name in cases:
+        if name not in CASES:
+            parser.error(f"unknown case '{name}', expected one of {', '.join(CASES)}")
+    for name in models:
+        if name not in MODELS:
+            parser.error(f"unknown model '{name}', expected one of {', '.join(MODELS)}")
+    sizes: list[int] = [int(size) for size in options.sizes.split(",")]
+    progress = lambda key: print(f"running {key}", file=sys.stderr, flush=True)
+    results: list[Result] = run(cases, models, sizes, options.repeat, options.profile, not options.no_memory, progress)
+    baseline: dict[str, float] = {}
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = {f"{r['case']}[{r['model']}]@{r['size']}": r["throughput"] for r in json.load(file)["results"]}
+    print(f"{'benchmark':<40} {'rows/s':>12} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'peak MiB':>10}{'  change' if baseline else ''}")
+    for result in results:
+        peak: str = "-" if result.peak_memory == None else f"{result.peak_memory / 2 ** 20:.2f}"
+        line: str = f"{result.key:<40} {result.throughput:>12,.0f} {result.p50 * 1000:>10.3f} {result.p95 * 1000:>10.3f} {result.p99 * 1000:>10.3f} {peak:>10}"
+        if result.key in baseline:
+            line += f"  {(result.throughput / baseline[result.key] - 1) * 100:+.1f}%"
+        print(line)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump({"environment": environment(), "results": [r.to_dict() for r in results]}, file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,145 @@
 from __future__ import annotations
 
 from enum import Enum
-import sqlite3, json, types, copy
-from typing import Generic, TypeVar, get_origin, get_args, Union, get_type_hints
+import sqlite3, json, types, threading, queue, weakref, asyncio, functools, itertools, base64, time, logging, re, hashlib, hmac, secrets, array
+from collections import OrderedDict, deque
+from datetime import datetime, date
+from decimal import Decimal
+from collections.abc import Mapping, MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, asynccontextmanager
+from typing import Generic, TypeVar, Iterable, Iterator, AsyncIterator, Callable, get_origin, get_args, Union, get_type_hints
 
 T = TypeVar('T')
 
+PROFILES: dict[str, dict[str, str | int]] = {
+    "default": {},
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+    },
+    "compact": {
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+    },
+    "bulk_load": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+SCHEMA_TABLE: str = "model_sqlite_schema"
+
 
 class InvalidColumns(Exception):
     def __init__(self, message: str) -> None:
         super().__init__(message)
 
 
+class InvalidRelation(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class PoolTimeout(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class InvalidToken(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class Codec:
+    def __init__(self, sql_type: str, encode: Callable = None, decode: Callable = None, collation: str = None) -> None:
+        self.sql_type: str = sql_type
+        self.encode: Callable = encode
+        self.decode: Callable = decode
+        self.collation: str = collation
+
+
+def __compare_decimal__(left: str, right: str) -> int:
+    try:
+        left_value, right_value = Decimal(left), Decimal(right)
+        return (left_value > right_value) - (left_value < right_value)
+    except ArithmeticError:
+        return (left > right) - (left < right)
+
+
+COLLATIONS: dict[str, Callable[[str, str], int]] = {
+    "DECIMAL": __compare_decimal__,
+}
+
+
+CODECS: dict[type, Codec] = {
+    bytes: Codec("BLOB"),
+    datetime: Codec("TEXT", datetime.isoformat, datetime.fromisoformat),
+    date: Codec("TEXT", date.isoformat, date.fromisoformat),
+    Decimal: Codec("TEXT", str, Decimal, "DECIMAL"),
+}
+sqlite3.register_adapter(datetime, datetime.isoformat)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(Decimal, str)
+
+
 class ColumnDescription:
     def __init__(self, name: str, type_definitions: type | tuple[type], default) -> None:
         self.type = type_definitions[0] if type(type_definitions) == tuple else type_definitions
         self.primary_key: bool = False
         self.not_null: bool = True
+        self.indexed: bool = False
+        self.unique: bool = False
+        self.references: type[References] = None
         if type(type_definitions) == tuple:
             if PrimaryKey in type_definitions:
                 self.primary_key = True
+            if Indexed in type_definitions:
+                self.indexed = True
+            if Unique in type_definitions:
+                self.unique = True
             if None in type_definitions or types.NoneType in type_definitions:
                 self.not_null = False
+            self.references = next((t for t in type_definitions if isinstance(t, type) and issubclass(t, References)), None)
+        self.is_json: bool = self.type == dict or __is_list__(self.type)
+        self.codec: Codec = __binary_codec__ if self.is_json and type(type_definitions) == tuple and Binary in type_definitions else __codec__(self.type)
+        self.dump: Callable = (self.codec.encode if self.codec else json.dumps) if self.is_json else None
+        self.decoder: Callable = self.load if self.is_json or (self.codec and self.codec.decode) else None
+        self.sql_type: str = self.codec.sql_type if self.codec else __to_sql_type__(self.type)
         self.has_default: bool = default != None
         self.default = default
-        self.sql: str = f"{name} {__to_sql_type__(self.type)}{' PRIMARY KEY' if self.primary_key else ''}{' NOT NULL' if self.not_null else ''}{f' DEFAULT {__stringify__(default)}' if self.has_default else ''}"
+        self.default_sql: str = __stringify__(self.encode(default)) if self.has_default else None
+        self.sql: str = f"{name} {self.sql_type}{f' COLLATE {self.codec.collation}' if self.codec and self.codec.collation else ''}{' PRIMARY KEY' if self.primary_key else ''}{' NOT NULL' if self.not_null else ''}{f' DEFAULT {self.default_sql}' if self.has_default else ''}{self.references.sql if self.references else ''}"
     
     def load(self, value, fix_string: bool = False):
         if value != None:
+            if self.codec and self.codec.decode:
+                return self.codec.decode(value)
             if fix_string and self.type == str:
                 return __break_string__(value)
-            if (self.type == dict or __is_list__(self.type)):
+            if self.is_json:
                 value = __break_string__(value)
                 value = json.loads(value)
         return value
+    
+    def encode(self, value):
+        if value != None and self.codec and self.codec.encode:
+            return self.codec.encode(value)
+        return value
+    
+    def raw_hash(self, value) -> int:
+        return hash(value if self.codec else __break_string__(value))
         
 
 class AttrObj(dict):
@@ -44,53 +150,741 @@ class AttrObj(dict):
         self[key] = value
 
 
-class TrackedObj:
-    def __init__(self, obj: AttrObj) -> None:
-        self.obj: AttrObj = obj
-        self.base: AttrObj = {}
-        for key, value in obj.items():
-            if type(value) == dict or type(value) == list:
-                self.base[key] = copy.deepcopy(value)
-            else:
-                self.base[key] = value
+class Row(MutableMapping):
+    __slots__ = ("__dirty__", "__hashes__", "__owner__", "__raw__", "__related__", "__exposed__", "__weakref__")
+    __fields__: tuple[str] = ()
+    __descriptors__: dict[str, types.MemberDescriptorType] = {}
+    __dumps__: dict[str, Callable] = {}
+    __arguments__: tuple = ()
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.__reset__()
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
     
-    @property
-    def changed(self) -> bool:
-        return self.obj != self.base
-    
-    def get_changes(self) -> dict:
-        changes: dict = {}
-        for key, value in self.obj.items():
-            if key in self.base and self.base[key] != value:
-                changes[key] = value
+    def __reset__(self) -> None:
+        object.__setattr__(self, "__dirty__", None)
+        object.__setattr__(self, "__hashes__", None)
+        object.__setattr__(self, "__owner__", None)
+        object.__setattr__(self, "__raw__", None)
+        object.__setattr__(self, "__related__", None)
+        object.__setattr__(self, "__exposed__", False)
+
+    def __getattr__(self, key):
+        if key.startswith("__") and key.endswith("__"):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{key}'")
+        if self.__raw__ and key in self.__raw__:
+            return self.__decode__(key)
+        if self.__related__ and key in self.__related__:
+            return self.__related__[key]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{key}'")
+    
+    def __setattr__(self, key, value) -> None:
+        if key not in self.__descriptors__:
+            raise AttributeError(f"'{type(self).__name__}' object has no column '{key}'")
+        self.__descriptors__[key].__set__(self, value)
+        if self.__raw__:
+            self.__raw__.pop(key, None)
+        self.__mark__(key)
+    
+    def __getitem__(self, key):
+        if key in self.__descriptors__:
+            try:
+                value = self.__descriptors__[key].__get__(self)
+                if key in self.__dumps__ and not self.__exposed__:
+                    self.__expose__()
+                return value
+            except AttributeError:
+                if self.__raw__ and key in self.__raw__:
+                    return self.__decode__(key)
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value) -> None:
+        if key not in self.__descriptors__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __delitem__(self, key) -> None:
+        if not self.__has__(key):
+            raise KeyError(key)
+        if self.__raw__:
+            self.__raw__.pop(key, None)
+        self.__descriptors__[key].__delete__(self)
+    
+    def __contains__(self, key) -> bool:
+        return self.__has__(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self.__fields__ if self.__has__(key))
+    
+    def __len__(self) -> int:
+        return sum(1 for key in self.__fields__ if self.__has__(key))
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Mapping):
+            return {key: self[key] for key in self} == {key: other[key] for key in other}
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return repr({key: self[key] for key in self})
+    
+    def __reduce__(self) -> tuple:
+        return (__restore_row__, (self.__arguments__, {key: self[key] for key in self}))
+    
+    def __copy__(self) -> Row:
+        return __restore_row__(self.__arguments__, {key: self[key] for key in self})
+    
+    def copy(self) -> dict:
+        return {key: self[key] for key in self}
+    
+    def __decode__(self, key):
+        description, value = self.__raw__.pop(key)
+        value = description.load(value)
+        self.__descriptors__[key].__set__(self, value)
+        if key in self.__dumps__ and not self.__exposed__:
+            self.__expose__()
+        return value
+    
+    def __expose__(self) -> None:
+        if self.__owner__ != None:
+            object.__setattr__(self, "__exposed__", True)
+            with self.__owner__.__lock__:
+                self.__owner__.__exposed__[id(self)] = self
+    
+    def __has__(self, key) -> bool:
+        if key not in self.__descriptors__:
+            return False
+        if self.__raw__ and key in self.__raw__:
+            return True
+        try:
+            self.__descriptors__[key].__get__(self)
+        except AttributeError:
+            return False
+        return True
+    
+    def __mark__(self, key) -> None:
+        if not self.__dirty__:
+            if self.__owner__ != None:
+                with self.__owner__.__lock__:
+                    self.__owner__.__dirty__[id(self)] = self
+            if self.__dirty__ == None:
+                object.__setattr__(self, "__dirty__", set())
+        self.__dirty__.add(key)
+    
+    def __track__(self, owner: Table, hashes: dict[str, int]) -> None:
+        object.__setattr__(self, "__owner__", owner)
+        object.__setattr__(self, "__hashes__", hashes)
+    
+    def __defer__(self, raw: dict[str, tuple[ColumnDescription, str]]) -> None:
+        object.__setattr__(self, "__raw__", raw)
+    
+    def __relate__(self, name: str, value: Row | list[Row] | None) -> None:
+        if self.__related__ == None:
+            object.__setattr__(self, "__related__", {})
+        self.__related__[name] = value
+    
+    def __changes__(self) -> dict:
+        changes: dict = {key: self[key] for key in self.__dirty__ or () if key in self}
+        for key, value_hash in (self.__hashes__ or {}).items():
+            if key not in changes and not (self.__raw__ and key in self.__raw__) and hash(self.__dumps__[key](self[key])) != value_hash:
+                changes[key] = self[key]
         return changes
+    
+    def __clean__(self, changes: dict) -> None:
+        for key, value in changes.items():
+            if key in self.__dumps__ and value != None:
+                if self.__hashes__ == None:
+                    object.__setattr__(self, "__hashes__", {})
+                self.__hashes__[key] = hash(self.__dumps__[key](value))
+        if self.__dirty__:
+            self.__dirty__.difference_update([key for key in self.__dirty__ if key in changes or key not in self])
+
+
+class RowLoader:
+    def __init__(self, row_class: type[Row], columns: list[str], descriptions: list[ColumnDescription], lazy: bool = False, key: str = None) -> None:
+        self.row_class: type[Row] = row_class
+        self.columns: list[str] = columns
+        self.descriptions: list[ColumnDescription] = descriptions
+        self.lazy: bool = lazy
+        self.key: int = columns.index(key) if key in columns else None
+        self.setters: list[Callable] = [row_class.__descriptors__[c].__set__ for c in columns]
+        self.loaders: list[Callable] = [d.decoder for d in descriptions]
+        self.json: list[int] = [i for i in range(len(descriptions)) if descriptions[i].is_json]
+    
+    def load(self, row: tuple, owner: Table = None, identity: weakref.WeakValueDictionary = None) -> Row:
+        if identity == None or self.key == None:
+            return self.build(row, owner)
+        with owner.__lock__:
+            obj: Row = identity.get(row[self.key])
+            if obj != None:
+                self.refresh(obj, row)
+                return obj
+            obj = self.build(row, owner)
+            identity[row[self.key]] = obj
+            return obj
+    
+    def build(self, row: tuple, owner: Table = None) -> Row:
+        obj: Row = self.row_class.__new__(self.row_class)
+        obj.__reset__()
+        if self.lazy:
+            raw: dict[str, tuple[ColumnDescription, str]] = {}
+            for i in range(len(row)):
+                if self.loaders[i] == None or row[i] == None:
+                    self.setters[i](obj, row[i])
+                else:
+                    raw[self.columns[i]] = (self.descriptions[i], row[i])
+            obj.__defer__(raw)
+        else:
+            for setter, loader, value in zip(self.setters, self.loaders, row):
+                setter(obj, value if loader == None or value == None else loader(value))
+        if owner != None:
+            obj.__track__(owner, {self.columns[i]: self.descriptions[i].raw_hash(row[i]) for i in self.json if row[i] != None})
+        return obj
+    
+    def refresh(self, obj: Row, row: tuple) -> None:
+        dirty: set[str] = obj.__dirty__ or ()
+        if obj.__hashes__ == None:
+            object.__setattr__(obj, "__hashes__", {})
+        for column, description, setter, loader, value in zip(self.columns, self.descriptions, self.setters, self.loaders, row):
+            if column in dirty:
+                continue
+            if not description.is_json or value == None:
+                if obj.__raw__:
+                    obj.__raw__.pop(column, None)
+                obj.__hashes__.pop(column, None)
+                setter(obj, value if loader == None or value == None else loader(value))
+                continue
+            value_hash: int = description.raw_hash(value)
+            previous: int = obj.__hashes__.get(column)
+            if previous == value_hash:
+                continue
+            if previous != None and not (obj.__raw__ and column in obj.__raw__) and hash(description.dump(obj.__descriptors__[column].__get__(obj))) != previous:
+                continue
+            if obj.__raw__:
+                obj.__raw__.pop(column, None)
+            obj.__hashes__[column] = value_hash
+            setter(obj, loader(value))
+
+
+class Binary:...
 
 
 class PrimaryKey:...
 
 
+class Indexed:...
+
+
+class Unique:...
+
+
+class References:
+    table: str = None
+    column: str = None
+    sql: str = ""
+    
+    @classmethod
+    @functools.cache
+    def __class_getitem__(cls, target: str | tuple[str, str]) -> type[References]:
+        table, column = target if type(target) == tuple else (target, None)
+        return type(f"References[{table}]", (References,), {"table": table, "column": column, "sql": f" REFERENCES {table}{f'({column})' if column else ''}"})
+
+
+class Index:
+    def __init__(self, *columns: str, unique: bool = False) -> None:
+        self.columns: tuple[str] = columns
+        self.unique: bool = unique
+    
+    def name(self, table: str) -> str:
+        return f"{'ux' if self.unique else 'ix'}_{table}_{'_'.join(self.columns)}"
+
+
+class Page(Generic[T]):
+    def __init__(self, rows: list[T], token: str | None) -> None:
+        self.rows: list[T] = rows
+        self.token: str | None = token
+    
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.rows)
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class QueryCache:
+    def __init__(self, size: int = 256, ttl: float = None) -> None:
+        self.size: int = size
+        self.ttl: float = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+        self.__entries__: OrderedDict[tuple, tuple[tuple[str], float, list[tuple]]] = OrderedDict()
+        self.__tables__: dict[str, set[tuple]] = {}
+        self.__generations__: dict[str, int] = {}
+        self.__lock__: threading.Lock = threading.Lock()
+    
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self.__entries__), "hits": self.hits, "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations}
+    
+    def get(self, key: tuple) -> list[tuple] | None:
+        with self.__lock__:
+            entry: tuple[tuple[str], float, list[tuple]] = self.__entries__.get(key)
+            if entry != None and entry[1] != None and entry[1] < time.monotonic():
+                self.__remove__(key)
+                self.evictions += 1
+                entry = None
+            if entry == None:
+                self.misses += 1
+                return None
+            self.__entries__.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+    
+    def generation(self, table: str | tuple[str]) -> int | tuple[int]:
+        if type(table) == tuple:
+            return tuple(self.__generations__.get(t, 0) for t in table)
+        return self.__generations__.get(table, 0)
+    
+    def put(self, table: str | tuple[str], key: tuple, rows: list[tuple], generation: int | tuple[int]) -> None:
+        with self.__lock__:
+            if generation != self.generation(table):
+                return
+            if key in self.__entries__:
+                self.__remove__(key)
+            tables: tuple[str] = table if type(table) == tuple else (table,)
+            self.__entries__[key] = (tables, None if self.ttl == None else time.monotonic() + self.ttl, rows)
+            for name in tables:
+                self.__tables__.setdefault(name, set()).add(key)
+            while len(self.__entries__) > self.size:
+                self.__remove__(next(iter(self.__entries__)))
+                self.evictions += 1
+    
+    def invalidate(self, table: str = None) -> None:
+        with self.__lock__:
+            tables: list[str] = list(self.__tables__.keys() | self.__generations__.keys()) if table == None else [table]
+            for name in tables:
+                self.__generations__[name] = self.generation(name) + 1
+                for key in self.__tables__.pop(name, set()):
+                    if key in self.__entries__:
+                        self.__remove__(key)
+                        self.invalidations += 1
+    
+    def __remove__(self, key: tuple) -> None:
+        tables, _, _ = self.__entries__.pop(key)
+        for name in tables:
+            self.__tables__.get(name, set()).discard(key)
+
+
+class QueryEvent:
+    def __init__(self, database: Database, terminal: str, sql: str, parameters: list | tuple) -> None:
+        self.database: Database = database
+        self.terminal: str = terminal
+        self.sql: str = sql
+        self.parameters: list | tuple = parameters
+        self.duration: float = 0.0
+        self.rows: int = None
+        self.decode_time: float = None
+        self.cached: bool = False
+        self.plan: list[str] = None
+        self.error: BaseException = None
+    
+    @property
+    def shape(self) -> str:
+        return re.sub(r"\?(\s*,\s*\?)+", "?, ...", self.sql)
+
+
+class SlowQueryLog:
+    def __init__(self, threshold: float = 0.1, explain: bool = False, logger: logging.Logger = None, keep: int = 100) -> None:
+        self.threshold: float = threshold
+        self.explain: bool = explain
+        self.logger: logging.Logger = logger or logging.getLogger("model_sqlite")
+        self.entries: deque[QueryEvent] = deque(maxlen=keep)
+    
+    def __call__(self, event: QueryEvent) -> None:
+        if event.duration < self.threshold and event.error == None:
+            return
+        if self.explain and not event.cached and event.error == None and event.sql.lstrip().upper().startswith("SELECT"):
+            event.plan = event.database.explain(event.sql, event.parameters)
+        self.entries.append(event)
+        if event.error != None:
+            self.logger.warning("Failed %s (%.1f ms, %s: %s): %s", event.terminal, event.duration * 1000, type(event.error).__name__, event.error, event.sql)
+        else:
+            self.logger.warning("Slow %s (%.1f ms, %s rows): %s%s", event.terminal, event.duration * 1000, event.rows, event.sql, "".join(f"\n  {step}" for step in event.plan or ()))
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.shapes: dict[str, dict[str, int | float]] = {}
+        self.__lock__: threading.Lock = threading.Lock()
+    
+    def __call__(self, event: QueryEvent) -> None:
+        with self.__lock__:
+            stats: dict[str, int | float] = self.shapes.setdefault(event.shape, {"count": 0, "total": 0.0, "max": 0.0, "rows": 0, "decode_time": 0.0, "cached": 0, "errors": 0})
+            stats["count"] += 1
+            stats["total"] += event.duration
+            stats["max"] = max(stats["max"], event.duration)
+            stats["rows"] += event.rows or 0
+            stats["decode_time"] += event.decode_time or 0.0
+            stats["cached"] += event.cached
+            stats["errors"] += event.error != None
+    
+    def export(self) -> list[dict[str, str | int | float]]:
+        with self.__lock__:
+            shapes: list[dict] = [{"shape": shape, **stats, "mean": stats["total"] / stats["count"]} for shape, stats in self.shapes.items()]
+        return sorted(shapes, key=lambda s: s["total"], reverse=True)
+    
+    def reset(self) -> None:
+        with self.__lock__:
+            self.shapes.clear()
+
+
+class PooledConnection:
+    def __init__(self, connection: sqlite3.Connection, pool: queue.Queue) -> None:
+        self.connection: sqlite3.Connection = connection
+        self.__finalizer__ = weakref.finalize(self, pool.put, connection)
+    
+    def release(self) -> None:
+        self.__finalizer__()
+
+
+class PooledCursor(sqlite3.Cursor):
+    pooled: PooledConnection = None
+    
+    def close(self) -> None:
+        super().close()
+        if self.pooled != None:
+            self.pooled.release()
+
+
 class Database:
-    def __init__(self, filepath: str, check_same_thread: bool = True) -> None:
+    def __init__(self, filepath: str, check_same_thread: bool = True, cached_statements: int = 256, pool_size: int = 0, pool_timeout: float = 5.0, busy_timeout: float = 5.0, profile: str = "default", pragmas: dict[str, str | int] = {}, cache_size: int = 0, cache_ttl: float = None, token_secret: bytes = None) -> None:
+        if pool_size > 0 and filepath == ":memory:":
+            raise ValueError("An in-memory database cannot be shared by a connection pool")
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of {', '.join(PROFILES.keys())}")
         self.filepath: str = filepath
-        self.database: sqlite3.Connection = sqlite3.connect(filepath, check_same_thread=check_same_thread)
+        self.pragmas: dict[str, str | int] = PROFILES[profile] | pragmas
+        self.cached_statements: int = cached_statements
+        self.pool_size: int = pool_size
+        self.pool_timeout: float = pool_timeout
+        self.busy_timeout: float = busy_timeout
+        self.database: sqlite3.Connection = self.__connect__(check_same_thread and pool_size == 0)
         self.cursor: sqlite3.Cursor = self.database.cursor()
+        self.__lock__: threading.RLock = threading.RLock()
+        self.__pool__: queue.Queue = queue.Queue()
+        self.__pool_lock__: threading.Lock = threading.Lock()
+        self.__pool_connections__: list[sqlite3.Connection] = []
+        self.__local__: threading.local = threading.local()
+        self.__transaction_depth__: int = 0
+        self.__transaction_thread__: int = None
+        self.__vacuum_pending__: bool = False
+        self.__invalidated__: set[str] = set()
+        self.__committed__: list[tuple[int, Callable[[], None]]] = []
+        self.__hooks__: list[Callable[[QueryEvent], None]] = []
+        self.__schema_version__: int = None
+        self.__schema_digests__: dict[str, str] = {}
+        self.__schema_fingerprints__: dict[str, str] = {}
+        self.__tables__: dict[str, Table] = {}
+        self.cache: QueryCache | None = QueryCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.__token_secret__: bytes = token_secret or secrets.token_bytes(32)
+    
+    def execute(self, command: str, commit: bool = False, vacuum: bool = False, parameters: list | tuple = ()) -> sqlite3.Cursor:
+        if self.__hooks__ and not hasattr(self.__local__, "event"):
+            with self.observe("execute", command, parameters) as event:
+                result: sqlite3.Cursor = self.__execute__(command, commit, vacuum, parameters)
+                event.rows = result.rowcount if result.rowcount >= 0 else None
+            return result
+        return self.__execute__(command, commit, vacuum, parameters)
+    
+    def execute_many(self, command: str, parameters: Iterable[list | tuple], commit: bool = False) -> sqlite3.Cursor:
+        with self.observe("execute_many", command, ()) as event:
+            with self.__lock__:
+                result = self.__cursor__().executemany(command, parameters)
+                self.__finish__(commit)
+            if event:
+                event.rows = result.rowcount
+            return result
+    
+    def add_hook(self, hook: Callable[[QueryEvent], None]) -> None:
+        self.__hooks__.append(hook)
+    
+    def remove_hook(self, hook: Callable[[QueryEvent], None]) -> None:
+        self.__hooks__.remove(hook)
+    
+    @contextmanager
+    def observe(self, terminal: str, command: str, parameters: list | tuple = ()) -> Iterator[QueryEvent | None]:
+        if not self.__hooks__ or hasattr(self.__local__, "event"):
+            yield None
+            return
+        event: QueryEvent = QueryEvent(self, terminal, command, parameters)
+        self.__local__.event = event
+        start: float = time.perf_counter()
+        try:
+            yield event
+        except BaseException as e:
+            event.error = e
+            raise
+        finally:
+            del self.__local__.event
+            event.duration = time.perf_counter() - start
+            self.__emit__(event)
+    
+    def schema(self) -> dict[str, str]:
+        version: int = self.execute("PRAGMA schema_version").fetchone()[0]
+        if version != self.__schema_version__:
+            statements: dict[str, list[str]] = {}
+            for table, sql in self.execute("SELECT tbl_name, sql FROM sqlite_master WHERE sql IS NOT NULL").fetchall():
+                statements.setdefault(table, []).append(sql)
+            self.__schema_fingerprints__ = dict(self.execute(f"SELECT name, fingerprint FROM {SCHEMA_TABLE}").fetchall()) if SCHEMA_TABLE in statements else {}
+            self.__schema_digests__ = {t: hashlib.sha1("\n".join(sorted(sql)).encode()).hexdigest() for t, sql in statements.items() if t != SCHEMA_TABLE}
+            self.__schema_version__ = version
+        return self.__schema_digests__
+    
+    def schema_matches(self, table: str, fingerprint: str, digest: str = None) -> bool:
+        digest = digest or self.schema().get(table)
+        return digest != None and self.__schema_fingerprints__.get(table) == __combine_fingerprint__(fingerprint, digest)
+    
+    def record_schema(self, table: str, fingerprint: str, store: bool = True) -> None:
+        combined: str = __combine_fingerprint__(fingerprint, self.schema()[table])
+        if store:
+            self.execute(f"CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} (name TEXT PRIMARY KEY, fingerprint TEXT NOT NULL)")
+            self.execute(f"INSERT INTO {SCHEMA_TABLE} (name, fingerprint) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET fingerprint = excluded.fingerprint", True, parameters=[table, combined])
+        self.__schema_fingerprints__[table] = combined
+    
+    def explain(self, command: str, parameters: list | tuple = ()) -> list[str]:
+        return [row[3] for row in self.__execute__(f"EXPLAIN QUERY PLAN {command}", parameters=parameters).fetchall()]
+    
+    def sign_token(self, scope: str, data) -> str:
+        payload: str = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+        return f"{payload}.{self.__token_signature__(scope, payload)}"
+    
+    def read_token(self, scope: str, token: str):
+        payload, _, signature = token.partition(".")
+        if not hmac.compare_digest(signature.encode(), self.__token_signature__(scope, payload).encode()):
+            raise InvalidToken(f"The token was not issued for {scope}")
+        return json.loads(base64.urlsafe_b64decode(payload.encode()))
     
-    def execute(self, command: str, commit: bool = False, vacuum: bool = False) -> sqlite3.Cursor:
-        result = self.cursor.execute(command)
+    def fetch(self, table: str | tuple[str], command: str, parameters: list | tuple = ()) -> list[tuple]:
+        with self.observe("fetch", command, parameters):
+            if self.cache == None or (self.__transaction_depth__ > 0 and self.__transaction_thread__ == threading.get_ident()):
+                rows: list[tuple] = self.__execute__(command, parameters=parameters).fetchall()
+            else:
+                key: tuple = (command, tuple(parameters))
+                rows: list[tuple] = self.cache.get(key)
+                if rows == None:
+                    generation: int = self.cache.generation(table)
+                    rows = self.__execute__(command, parameters=parameters).fetchall()
+                    self.cache.put(table, key, rows, generation)
+                elif hasattr(self.__local__, "event"):
+                    self.__local__.event.cached = True
+            if hasattr(self.__local__, "event"):
+                self.__local__.event.rows = len(rows)
+            return rows
+    
+    def invalidate(self, table: str) -> None:
+        if self.cache == None:
+            return
+        self.cache.invalidate(table)
+        if self.__transaction_depth__ > 0:
+            self.__invalidated__.add(table)
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Database]:
+        with self.__lock__:
+            savepoint: str = f"transaction_{self.__transaction_depth__}"
+            self.database.execute(f"SAVEPOINT {savepoint}")
+            self.__transaction_depth__ += 1
+            self.__transaction_thread__ = threading.get_ident()
+            try:
+                yield self
+            except BaseException:
+                self.__transaction_depth__ -= 1
+                self.database.execute(f"ROLLBACK TO {savepoint}")
+                self.database.execute(f"RELEASE {savepoint}")
+                self.__committed__ = [(depth, c) for depth, c in self.__committed__ if depth <= self.__transaction_depth__]
+                if self.__transaction_depth__ == 0:
+                    self.database.rollback()
+                    self.__vacuum_pending__ = False
+                    self.__flush_invalidations__()
+                raise
+            self.__transaction_depth__ -= 1
+            self.database.execute(f"RELEASE {savepoint}")
+            self.__finish__(True, self.__vacuum_pending__)
+            if self.__transaction_depth__ == 0:
+                self.__flush_invalidations__()
+                committed: list[tuple[int, Callable[[], None]]] = self.__committed__
+                self.__committed__ = []
+                for _, callback in committed:
+                    callback()
+    
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        if self.__transaction_depth__ > 0 and self.__transaction_thread__ == threading.get_ident():
+            self.__committed__.append((self.__transaction_depth__, callback))
+        else:
+            callback()
+    
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        bound: bool = hasattr(self.__local__, "connection")
+        try:
+            yield self.__reader__()
+        finally:
+            if not bound:
+                self.release()
+    
+    def release(self) -> None:
+        if hasattr(self.__local__, "connection"):
+            self.__local__.connection.release()
+            del self.__local__.connection
+    
+    def close(self) -> None:
+        self.release()
+        with self.__pool_lock__:
+            for connection in self.__pool_connections__:
+                connection.close()
+            self.__pool_connections__ = []
+        self.database.close()
+    
+    def stream_batches(self, command: str, parameters: list | tuple = (), batch_size: int = 1000, terminal: str = "stream") -> Iterator[list[tuple]]:
+        event: QueryEvent = QueryEvent(self, terminal, command, parameters) if self.__hooks__ and not hasattr(self.__local__, "event") else None
+        cursor: sqlite3.Cursor = None
+        start: float = time.perf_counter()
+        try:
+            cursor = self.__read_cursor__() if self.__reads_from_pool__(command) else self.database.cursor()
+            cursor.execute(command, parameters)
+            while rows := cursor.fetchmany(batch_size):
+                if event:
+                    event.duration += time.perf_counter() - start
+                    event.rows = (event.rows or 0) + len(rows)
+                yield rows
+                start = time.perf_counter()
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            if event:
+                event.error = e
+            raise
+        finally:
+            if cursor != None:
+                cursor.close()
+            if event:
+                event.duration += time.perf_counter() - start
+                event.rows = event.rows or 0
+                self.__emit__(event)
+    
+    def checkpoint(self, mode: str = "PASSIVE") -> tuple[int, int, int]:
+        with self.__lock__:
+            return self.database.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    
+    def incremental_vacuum(self, pages: int = 0) -> None:
+        with self.__lock__:
+            self.database.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+    
+    def __execute__(self, command: str, commit: bool = False, vacuum: bool = False, parameters: list | tuple = ()) -> sqlite3.Cursor:
+        if self.__reads_from_pool__(command):
+            return self.__read_cursor__().execute(command, parameters)
+        with self.__lock__:
+            result = self.__cursor__().execute(command, parameters)
+            self.__finish__(commit, vacuum)
+            return result
+    
+    def __emit__(self, event: QueryEvent) -> None:
+        for hook in list(self.__hooks__):
+            hook(event)
+    
+    def __token_signature__(self, scope: str, payload: str) -> str:
+        return hmac.new(self.__token_secret__, f"{scope}:{payload}".encode(), hashlib.sha256).hexdigest()[:32]
+    
+    def __connect__(self, check_same_thread: bool = False) -> sqlite3.Connection:
+        connection: sqlite3.Connection = sqlite3.connect(self.filepath, timeout=self.busy_timeout, check_same_thread=check_same_thread, cached_statements=self.cached_statements)
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}").fetchall()
+        for name, collation in COLLATIONS.items():
+            connection.create_collation(name, collation)
+        return connection
+    
+    def __cursor__(self) -> sqlite3.Cursor:
+        return self.cursor if self.pool_size == 0 else self.database.cursor()
+    
+    def __reads_from_pool__(self, command: str) -> bool:
+        if self.pool_size == 0:
+            return False
+        if self.__transaction_depth__ > 0 and self.__transaction_thread__ == threading.get_ident():
+            return False
+        return command.lstrip().upper().startswith(("SELECT", "PRAGMA", "EXPLAIN"))
+    
+    def __reader__(self) -> sqlite3.Connection:
+        if not hasattr(self.__local__, "connection"):
+            self.__local__.connection = self.__checkout__()
+        return self.__local__.connection.connection
+    
+    def __read_cursor__(self) -> sqlite3.Cursor:
+        if hasattr(self.__local__, "connection"):
+            return self.__local__.connection.connection.cursor()
+        pooled: PooledConnection = self.__checkout__()
+        cursor: PooledCursor = pooled.connection.cursor(PooledCursor)
+        cursor.pooled = pooled
+        return cursor
+    
+    def __checkout__(self) -> PooledConnection:
+        try:
+            connection: sqlite3.Connection = self.__pool__.get_nowait()
+        except queue.Empty:
+            connection: sqlite3.Connection = None
+            with self.__pool_lock__:
+                if len(self.__pool_connections__) < self.pool_size:
+                    connection = self.__connect__()
+                    self.__pool_connections__.append(connection)
+            if connection == None:
+                try:
+                    connection = self.__pool__.get(timeout=self.pool_timeout)
+                except queue.Empty:
+                    raise PoolTimeout(f"No pooled connection became available within {self.pool_timeout} seconds")
+        return PooledConnection(connection, self.__pool__)
+    
+    def __flush_invalidations__(self) -> None:
+        for table in self.__invalidated__:
+            self.cache.invalidate(table)
+        self.__invalidated__.clear()
+    
+    def __finish__(self, commit: bool, vacuum: bool = False) -> None:
+        if self.__transaction_depth__ > 0:
+            self.__vacuum_pending__ = self.__vacuum_pending__ or vacuum
+            return
         if commit:
             self.database.commit()
         if vacuum:
-            self.cursor.execute("VACUUM")
-        return result
+            self.__vacuum_pending__ = False
+            if self.database.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                self.incremental_vacuum()
+            else:
+                self.__cursor__().execute("VACUUM")
     
     def create_table(self, name: str, columns: dict[str, ColumnDescription]) -> None:
         self.execute(f"CREATE TABLE {name} ({', '.join(v.sql for v in columns.values())})")
 
     def delete_table(self, name: str) -> None:
         self.execute(f"DROP TABLE {name}")
+        if self.__schema_fingerprints__.pop(name, None) != None and self.execute("SELECT 1 FROM sqlite_master WHERE name = ?", parameters=[SCHEMA_TABLE]).fetchone():
+            self.execute(f"DELETE FROM {SCHEMA_TABLE} WHERE name = ?", True, parameters=[name])
+        self.invalidate(name)
+    
+    def rebuild_table(self, name: str, columns: dict[str, ColumnDescription], keep: list[str]) -> None:
+        rebuilt: str = f"{name}_rebuild"
+        self.execute(f"CREATE TABLE {rebuilt} ({', '.join(v.sql for v in columns.values())})")
+        if keep:
+            self.execute(f"INSERT INTO {rebuilt} ({', '.join(f'[{c}]' for c in keep)}) SELECT {', '.join(f'[{c}]' for c in keep)} FROM {name}")
+        self.execute(f"DROP TABLE {name}")
+        self.execute(f"ALTER TABLE {rebuilt} RENAME TO {name}", True)
+        self.invalidate(name)
 
     def clear_table(self, name: str) -> None:
         self.execute(f"DELETE FROM {name}", True, True)
+        self.invalidate(name)
     
     def insert(self, table: str, data: list, columns: list[str] = None) -> None:
         if len(data) != len(columns):
@@ -98,118 +892,458 @@ class Database:
         command: str = f"INSERT INTO {table} "
         if columns:
             command += f"({', '.join(columns)}) "
-        command += f"VALUES ({', '.join([__stringify__(d) for d in data])})"
-        self.execute(command, True)
+        command += f"VALUES ({', '.join('?' for _ in data)})"
+        self.execute(command, True, parameters=[__to_parameter__(d) for d in data])
+        self.invalidate(table)
+    
+    def insert_many(self, table: str, rows: list[list], columns: list[str], return_ids: bool = False, key: str = None) -> list[int]:
+        if columns:
+            command: str = f"INSERT INTO {table} ({', '.join(f'[{c}]' for c in columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        else:
+            command: str = f"INSERT INTO {table} DEFAULT VALUES"
+        parameters: list[list] = [[__to_parameter__(d) for d in data] for data in rows]
+        self.invalidate(table)
+        if not return_ids:
+            self.execute_many(command, parameters)
+            return []
+        ids: list[int] = []
+        if not columns:
+            for data in parameters:
+                ids.append(self.execute(command, parameters=data).lastrowid)
+            return ids
+        values: str = f"({', '.join('?' for _ in columns)})"
+        position: int = columns.index(key) if key in columns else None
+        with self.transaction():
+            for chunk in itertools.batched(parameters, max(1, self.database.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER) // len(columns))):
+                command = f"INSERT INTO {table} ({', '.join(f'[{c}]' for c in columns)}) VALUES {', '.join(values for _ in chunk)} RETURNING rowid"
+                returned: set[int] = {row[0] for row in self.execute(command, parameters=[d for data in chunk for d in data]).fetchall()}
+                explicit: list[int | None] = [None if position == None else data[position] for data in chunk]
+                assigned: Iterator[int] = iter(sorted(returned.difference(explicit)))
+                ids += [next(assigned) if rowid == None else rowid for rowid in explicit]
+        return ids
+    
+    def update_many(self, table: str, rows: list[list], columns: list[str], key: str) -> None:
+        command: str = f"UPDATE {table} SET {', '.join(f'[{c}] = ?' for c in columns)} WHERE [{key}] = ?"
+        self.execute_many(command, [[__to_parameter__(d) for d in data] for data in rows])
+        self.invalidate(table)
     
     def table_exists(self, table: str) -> bool:
-        return len(self.execute(f"SELECT name FROM sqlite_master WHERE name = '{table}'").fetchall()) > 0
+        return len(self.execute("SELECT name FROM sqlite_master WHERE name = ?", parameters=[table]).fetchall()) > 0
     
     def get_table_columns(self, table: str) -> list[tuple]:
         return self.execute(f"PRAGMA table_info({table})").fetchall()
     
     def add_column(self, table: str, column: ColumnDescription) -> None:
         self.execute(f"ALTER TABLE {table} ADD {column.sql}", True)
+        self.invalidate(table)
     
     def delete_column(self, table: str, column: str) -> None:
         self.execute(f"ALTER TABLE {table} DROP {column}", True)
+        self.invalidate(table)
+    
+    def get_table_indexes(self, table: str) -> dict[str, Index]:
+        indexes: dict[str, Index] = {}
+        for row in self.execute(f"PRAGMA index_list({table})").fetchall():
+            if row[3] == "c":
+                columns: list[str] = [c[2] for c in self.execute(f"PRAGMA index_info({row[1]})").fetchall()]
+                indexes[row[1]] = Index(*columns, unique=row[2] == 1)
+        return indexes
+    
+    def create_index(self, table: str, index: Index, name: str = None) -> None:
+        self.execute(f"CREATE {'UNIQUE ' if index.unique else ''}INDEX IF NOT EXISTS {name or index.name(table)} ON {table} ({', '.join(index.columns)})", True)
+    
+    def delete_index(self, name: str) -> None:
+        self.execute(f"DROP INDEX {name}", True)
     
 
 class Table(Generic[T]):
     def __init__(self, database: Database, name: str, model: type, dont_force_compatibility: bool = False) -> None:
-        self.__loaded__: list[TrackedObj] = []
+        self.__exposed__: weakref.WeakValueDictionary[int, Row] = weakref.WeakValueDictionary()
+        self.__identity__: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self.__dirty__: dict[int, Row] = {}
+        self.__lock__: threading.RLock = threading.RLock()
+        self.__loaders__: dict[tuple[tuple[str], bool], RowLoader] = {}
         self.__database__: Database = database
         self.name: str = name
         self.__model__: type = model
         self.__column_descriptions__: dict[str, ColumnDescription] = __interpret_class__(model)
-        if not self.__database__.table_exists(self.name):
-            self.__database__.create_table(self.name, self.__column_descriptions__)
-        elif not dont_force_compatibility:
-            table_columns: list[tuple] = self.__database__.get_table_columns(self.name)
-            for row in table_columns:
-                incompatible: bool = False
-                if row[1] not in self.__column_descriptions__.keys():
-                    incompatible = True
-                else:
-                    column: ColumnDescription = self.__column_descriptions__[row[1]]
-                    if  row[2] != __to_sql_type__(column.type):
-                        incompatible = True
-                    elif row[3] == 0 and column.not_null:
-                        incompatible = True
-                    elif column.load(row[4], fix_string=True) != column.default:
-                        incompatible = True
-                    elif row[5] != 0 and not column.primary_key:
-                        incompatible = True
-                if incompatible:
-                    self.__database__.delete_column(self.name, row[1])
-            table_column_names: list[str] = [c[1] for c in table_columns]
-            for column_name, column_obj in self.__column_descriptions__.items():
-                if column_name not in table_column_names:
-                    self.__database__.add_column(self.name, column_obj)
+        self.__primary_key__: str = next((n for n, d in self.__column_descriptions__.items() if d.primary_key), None)
+        self.__rowid__: str = self.__primary_key__ if self.__primary_key__ and self.__column_descriptions__[self.__primary_key__].sql_type == "INTEGER" else None
+        self.__row_class__: type[Row] = __row_class__(model.__name__, tuple(self.__column_descriptions__.keys()), tuple((n, d.dump) for n, d in self.__column_descriptions__.items() if d.is_json))
+        self.__indexes__: dict[str, Index] = {i.name(self.name): i for i in __interpret_indexes__(model, self.__column_descriptions__)}
+        self.__database__.__tables__[self.name] = self
+        fingerprint: str = __fingerprint__(self.__column_descriptions__, self.__indexes__)
+        digest: str = self.__database__.schema().get(self.name)
+        if digest == None:
+            with self.__database__.transaction():
+                self.__database__.create_table(self.name, self.__column_descriptions__)
+                for index in self.__indexes__.values():
+                    self.__database__.create_index(self.name, index)
+                self.__database__.record_schema(self.name, fingerprint)
+        elif not dont_force_compatibility and not self.__database__.schema_matches(self.name, fingerprint, digest):
+            if self.__compatible__():
+                self.__database__.record_schema(self.name, fingerprint, False)
+            else:
+                with self.__database__.transaction():
+                    self.__reconcile__()
+                    self.__database__.record_schema(self.name, fingerprint)
+    
+    def __iter__(self) -> Iterator[T]:
+        if self.__primary_key__ == None:
+            return self.SELECT().ITER()
+        return self.SELECT().SCAN()
     
     @property
     def is_empty(self) -> bool:
-        return len(self.SELECT().TO_LIST()) == 0
+        return not self.SELECT().LIMIT(1).EXISTS()
     
     def clear(self) -> None:
         self.__database__.clear_table(self.name)
+        with self.__lock__:
+            self.__evict__(list(self.__identity__.keys()))
 
     def SELECT(self) -> Select[T]:
-        return Select(self, self.__column_descriptions__, f"SELECT * FROM [{self.name}] AS [t0]")
+        return Select(self, self.__column_descriptions__, f"SELECT * FROM [{self.name}] AS [t0]", alias="t0")
     
     def INSERT(self, object: T) -> T:
+        data, columns = self.__insert_values__(object)
+        return self.__returning__(self.__insert_command__("INSERT", columns), data)[0]
+    
+    def INSERT_OR_IGNORE(self, object: T) -> T | None:
+        data, columns = self.__insert_values__(object)
+        rows: list[T] = self.__returning__(self.__insert_command__("INSERT OR IGNORE", columns), data)
+        return rows[0] if rows else None
+    
+    def REPLACE(self, object: T) -> T:
+        data, columns = self.__insert_values__(object)
+        with self.__database__.transaction():
+            self.__evict__(self.__conflicting_keys__(data, columns))
+            return self.__returning__(self.__insert_command__("INSERT OR REPLACE", columns), data)[0]
+    
+    def UPSERT(self, object: T, conflict_on: str | Iterable[str] = None, update: Iterable[str] = None) -> T:
+        data, columns = self.__insert_values__(object)
+        return self.__returning__(self.__insert_command__("INSERT", columns) + self.__conflict_clause__(columns, conflict_on, update), data)[0]
+    
+    def UPSERT_MANY(self, objects: Iterable[T], conflict_on: str | Iterable[str] = None, update: Iterable[str] = None, chunk_size: int = 1000, return_rows: bool = False) -> list[T] | None:
+        rows: list[T] = []
+        batch: list[list] = []
+        batch_columns: list[str] = []
+        with self.__database__.transaction():
+            for object in objects:
+                data, columns = self.__insert_values__(object)
+                if return_rows:
+                    rows += self.__returning__(self.__insert_command__("INSERT", columns) + self.__conflict_clause__(columns, conflict_on, update), data)
+                    continue
+                if batch and (columns != batch_columns or len(batch) >= chunk_size):
+                    self.__database__.execute_many(self.__insert_command__("INSERT", batch_columns) + self.__conflict_clause__(batch_columns, conflict_on, update), batch)
+                    batch = []
+                batch.append([__to_parameter__(d) for d in data])
+                batch_columns = columns
+            if batch:
+                self.__database__.execute_many(self.__insert_command__("INSERT", batch_columns) + self.__conflict_clause__(batch_columns, conflict_on, update), batch)
+        self.__database__.invalidate(self.name)
+        return rows if return_rows else None
+    
+    def INSERT_MANY(self, objects: Iterable[T], chunk_size: int = 1000, return_ids: bool = False) -> list[int] | None:
+        ids: list[int] = []
+        batch: list[list] = []
+        batch_columns: list[str] = []
+        with self.__database__.transaction():
+            for object in objects:
+                data, columns = self.__insert_values__(object)
+                if batch and (columns != batch_columns or len(batch) >= chunk_size):
+                    ids += self.__database__.insert_many(self.name, batch, batch_columns, return_ids, self.__rowid__)
+                    batch = []
+                batch.append(data)
+                batch_columns = columns
+            if batch:
+                ids += self.__database__.insert_many(self.name, batch, batch_columns, return_ids, self.__rowid__)
+        return ids if return_ids else None
+    
+    def UPDATE(self, object) -> Whereable[T]:
+        sql: str = f"UPDATE {self.name} SET "
+        parameters: list = []
+        for key, value in object.items() if isinstance(object, Mapping) else vars(object).items():
+            sql += f"[{key}] = ?, "
+            parameters.append(__to_parameter__(self.__column_descriptions__[key].encode(value) if key in self.__column_descriptions__ else value))
+        return Whereable(self, self.__column_descriptions__, sql.removesuffix(", "), parameters=parameters)
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Table[T]]:
+        with self.__database__.transaction():
+            yield self
+            self.save_changes()
+    
+    def save_changes(self) -> None:
+        with self.__lock__:
+            changed: dict[int, Row] = dict(self.__dirty__)
+            for obj in list(self.__exposed__.values()):
+                changed[id(obj)] = obj
+        batches: dict[tuple[str], list[list]] = {}
+        saved: list[tuple[Row, dict]] = []
+        with self.__database__.transaction():
+            for obj in changed.values():
+                changes: dict = {k: v for k, v in obj.__changes__().items() if k in self.__column_descriptions__}
+                if changes and self.__primary_key__ and self.__primary_key__ not in changes:
+                    batches.setdefault(tuple(changes.keys()), []).append([self.__column_descriptions__[k].encode(v) for k, v in changes.items()] + [obj[self.__primary_key__]])
+                elif changes:
+                    self.UPDATE(changes).WHERE_OBJ(obj).EXECUTE()
+                saved.append((obj, changes))
+            for columns, rows in batches.items():
+                self.__database__.update_many(self.name, rows, list(columns), self.__primary_key__)
+            self.__database__.after_commit(lambda: self.__saved__(saved))
+    
+    def __saved__(self, saved: list[tuple[Row, dict]]) -> None:
+        with self.__lock__:
+            for obj, changes in saved:
+                obj.__clean__(changes)
+                if not obj.__dirty__:
+                    self.__dirty__.pop(id(obj), None)
+    
+    def __compatible__(self) -> bool:
+        table_columns: list[tuple] = self.__database__.get_table_columns(self.name)
+        if self.__incompatible_columns__(table_columns) or any(c not in [r[1] for r in table_columns] for c in self.__column_descriptions__):
+            return False
+        indexes: dict[str, Index] = self.__database__.get_table_indexes(self.name)
+        managed: set[str] = {n for n in indexes if n.startswith((f"ix_{self.name}_", f"ux_{self.name}_"))}
+        return managed == set(self.__indexes__) and all(indexes[n].columns == i.columns for n, i in self.__indexes__.items())
+    
+    def __incompatible_columns__(self, table_columns: list[tuple]) -> list[str]:
+        incompatible_columns: list[str] = []
+        for row in table_columns:
+            incompatible: bool = False
+            if row[1] not in self.__column_descriptions__.keys():
+                incompatible = True
+            else:
+                column: ColumnDescription = self.__column_descriptions__[row[1]]
+                if  row[2] != column.sql_type:
+                    incompatible = True
+                elif row[3] == 0 and column.not_null:
+                    incompatible = True
+                elif row[4] != column.default_sql:
+                    incompatible = True
+                elif row[5] != 0 and not column.primary_key:
+                    incompatible = True
+            if incompatible:
+                incompatible_columns.append(row[1])
+        return incompatible_columns
+    
+    def __reconcile__(self) -> None:
+        table_columns: list[tuple] = self.__database__.get_table_columns(self.name)
+        incompatible_columns: list[str] = self.__incompatible_columns__(table_columns)
+        if incompatible_columns:
+            logging.getLogger("model_sqlite").warning("Dropping incompatible columns %s from %s", ", ".join(incompatible_columns), self.name)
+        table_column_names: list[str] = [c[1] for c in table_columns if c[1] not in incompatible_columns]
+        kept_indexes: dict[str, Index] = {}
+        for name, index in self.__database__.get_table_indexes(self.name).items():
+            managed: bool = name.startswith((f"ix_{self.name}_", f"ux_{self.name}_"))
+            if (managed and name not in self.__indexes__) or any(c in incompatible_columns for c in index.columns):
+                self.__database__.delete_index(name)
+            elif not managed:
+                kept_indexes[name] = index
+        try:
+            if len(incompatible_columns) > 1:
+                raise sqlite3.OperationalError("Several columns changed")
+            with self.__database__.transaction():
+                for column_name in incompatible_columns:
+                    self.__database__.delete_column(self.name, column_name)
+                for column_name, column_obj in self.__column_descriptions__.items():
+                    if column_name not in table_column_names:
+                        self.__database__.add_column(self.name, column_obj)
+        except sqlite3.OperationalError:
+            self.__database__.rebuild_table(self.name, self.__column_descriptions__, [c for c in table_column_names if c in self.__column_descriptions__])
+            for name, index in kept_indexes.items():
+                self.__database__.create_index(self.name, index, name)
+        for index in self.__indexes__.values():
+            self.__database__.create_index(self.name, index)
+    
+    def __row_loader__(self, columns: list[str], lazy: bool = False) -> RowLoader:
+        key: tuple[tuple[str], bool] = (tuple(columns), lazy)
+        if key not in self.__loaders__:
+            self.__loaders__[key] = RowLoader(self.__row_class__, columns, [self.__column_descriptions__[c] for c in columns], lazy, self.__primary_key__ if len(columns) == len(self.__column_descriptions__) else None)
+        return self.__loaders__[key]
+    
+    def __insert_command__(self, verb: str, columns: list[str]) -> str:
+        if not columns:
+            return f"{verb} INTO {self.name} DEFAULT VALUES"
+        return f"{verb} INTO {self.name} ({', '.join(f'[{c}]' for c in columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    
+    def __conflict_clause__(self, columns: list[str], conflict_on: str | Iterable[str] = None, update: Iterable[str] = None) -> str:
+        targets: list[str] = [conflict_on] if type(conflict_on) == str else list(conflict_on) if conflict_on else [c for c in [self.__primary_key__] if c]
+        if not targets:
+            raise InvalidColumns(f"UPSERT on {self.name} needs conflict_on columns or a primary key")
+        for column in targets + list(update or []):
+            if column not in self.__column_descriptions__:
+                raise InvalidColumns(f"'{column}' is not a column of {self.name}")
+        assignments: list[str] = [c for c in (update or columns) if c in columns and c not in targets] or targets[:1]
+        return f" ON CONFLICT ({', '.join(f'[{t}]' for t in targets)}) DO UPDATE SET {', '.join(f'[{c}] = excluded.[{c}]' for c in assignments)}"
+    
+    def __returning__(self, command: str, data: list) -> list[T]:
+        columns: list[str] = list(self.__column_descriptions__.keys())
+        with self.__database__.transaction():
+            rows: list[tuple] = self.__database__.execute(f"{command} RETURNING {', '.join(f'[{c}]' for c in columns)}", parameters=[__to_parameter__(d) for d in data]).fetchall()
+        self.__database__.invalidate(self.name)
+        loader: RowLoader = self.__row_loader__(columns)
+        return [loader.load(row, self, self.__identity_map__(loader)) for row in rows]
+    
+    def __conflicting_keys__(self, data: list, columns: list[str]) -> list:
+        if self.__primary_key__ == None or len(self.__identity__) == 0:
+            return []
+        values: dict = dict(zip(columns, data))
+        targets: list[tuple[str]] = [t for t in [(self.__primary_key__,)] + [i.columns for i in self.__indexes__.values() if i.unique] if all(values.get(c) != None for c in t)]
+        if not targets:
+            return []
+        condition: str = " OR ".join(f"({' AND '.join(f'[{c}] = ?' for c in t)})" for t in targets)
+        return [row[0] for row in self.__database__.execute(f"SELECT [{self.__primary_key__}] FROM [{self.name}] WHERE {condition}", parameters=[__to_parameter__(values[c]) for t in targets for c in t]).fetchall()]
+    
+    def __evict__(self, keys: Iterable) -> None:
+        with self.__lock__:
+            for key in keys:
+                obj: Row = self.__identity__.pop(key, None)
+                if obj != None:
+                    self.__dirty__.pop(id(obj), None)
+    
+    def __identity_map__(self, loader: RowLoader) -> weakref.WeakValueDictionary | None:
+        return None if loader.key == None else self.__identity__
+    
+    def __insert_values__(self, object: T) -> tuple[list, list[str]]:
         data: list = []
         columns: list[str] = []
-        retrieval: Select = self.SELECT()
         for column, description in self.__column_descriptions__.items():
-            if description.primary_key:
-                retrieval = retrieval.ORDER_BY(column, True).LIMIT(1)
             if hasattr(object, column):
                 value = getattr(object, column)
                 if not __validate_type__(description.type, type(value)):
                     continue
-                data.append(value)
+                data.append(description.encode(value))
                 columns.append(column)
-        self.__database__.insert(self.name, data, columns)
-        return retrieval.TO_LIST()[-1]
-    
-    def UPDATE(self, object) -> Whereable[T]:
-        sql: str = f"UPDATE {self.name} SET "
-        for key, value in object.items() if type(object) == dict else vars(object).items():
-            sql += f"'{key}' = {__stringify__(value)}, "
-        return Whereable(self, self.__column_descriptions__, sql.removesuffix(", "))
-    
-    def save_changes(self) -> None:
-        for tracked in self.__loaded__:
-            if tracked.changed:
-                self.UPDATE(tracked.get_changes()).WHERE_OBJ(tracked.obj).EXECUTE()
+        return data, columns
 
 
 class SQLBase(Generic[T]):
-    def __init__(self, table: Table, column_descriptions: dict[str, ColumnDescription], query: str = "", group: str = "", table_number: int = 0) -> None:
+    def __init__(self, table: Table, column_descriptions: dict[str, ColumnDescription], query: str = "", group: str = "", parameters: list = [], group_parameters: list = [], alias: str = None) -> None:
         self.__table__: Table = table
         self.__column_descriptions__: dict[str, ColumnDescription] = column_descriptions
         self.__query__: str = query
         self.__group__: str = group
-        self.__table_number__: int = table_number
+        self.__parameters__: list = list(parameters)
+        self.__group_parameters__: list = list(group_parameters)
+        self.__alias__: str = alias
+        self.__distinct__: bool = False
+        self.__where__: list[str] = []
+        self.__where_parameters__: list = []
+        self.__order__: list[str] = []
+        self.__limit__: int = None
+        self.__offset__: int = None
+        self.__columns__: list[str] = None
+        self.__lazy__: bool = False
+        self.__joins__: list[tuple[str, str, str]] = []
+        self.__prefetches__: list[tuple[str, str]] = []
     
     @property
     def query(self) -> str:
-        return f"{self.__query__}{f' {self.__group__.strip()}' if self.__group__ != '' else ''}"
+        return self.__statement__() + self.__clauses__()
+    
+    @property
+    def parameters(self) -> list:
+        return self.__parameters__ + self.__clause_parameters__()
+    
+    def __statement__(self) -> str:
+        if not self.__query__.startswith("SELECT *"):
+            return self.__query__
+        projection: str = ", ".join(self.__column__(c) for c in self.__selected__())
+        joins: str = ""
+        for _, column, alias in self.__joins__:
+            target, key = self.__relation__(column)
+            projection += "".join(f", [{alias}].[{c}]" for c in target.__column_descriptions__)
+            joins += f" LEFT JOIN [{target.name}] AS [{alias}] ON [{alias}].[{key}] = {self.__column__(column)}"
+        return f"SELECT{' DISTINCT' if self.__distinct__ else ''} {projection}{self.__query__.removeprefix('SELECT *')}{joins}"
+    
+    def __source__(self) -> str:
+        return self.__query__.removeprefix("SELECT *")
+    
+    def __scalar__(self, function: str, column: str = None):
+        if column != None and column not in self.__column_descriptions__:
+            raise InvalidColumns(f"'{column}' is not a column of {self.__table__.name}")
+        if self.__limit__ != None or self.__distinct__:
+            command: str = f"SELECT {function}({f'[T1].[{column}]' if column else '*'}) FROM ({self.query}) AS [T1]"
+        else:
+            command: str = f"SELECT {function}({self.__column__(column) if column else '*'}){self.__source__()}{self.__clauses__(False)}"
+        parameters: list = self.parameters
+        with self.__table__.__database__.observe(function, command, parameters):
+            result = self.__table__.__database__.fetch(self.__table__.name, command, parameters)[0][0]
+        if function in ("MIN", "MAX") and column != None:
+            return self.__column_descriptions__[column].load(result)
+        return result
+    
+    def __relation__(self, column: str) -> tuple[Table, str]:
+        description: ColumnDescription = self.__column_descriptions__.get(column)
+        if description == None or description.references == None:
+            raise InvalidRelation(f"'{column}' is not a reference column of {self.__table__.name}")
+        target: Table = self.__table__.__database__.__tables__.get(description.references.table)
+        if target == None:
+            raise InvalidRelation(f"Table '{description.references.table}' has not been opened on this database")
+        return target, description.references.column or target.__primary_key__
+    
+    def __sources__(self) -> tuple[str]:
+        return (self.__table__.name,) + tuple(self.__relation__(column)[0].name for _, column, _ in self.__joins__)
+    
+    def __selected__(self) -> list[str]:
+        return self.__columns__ if self.__columns__ else list(self.__column_descriptions__.keys())
+    
+    def __clauses__(self, ordered: bool = True, group_by: list[str] = []) -> str:
+        clauses: str = ""
+        where: list[str] = self.__where__ + ([self.__group__.strip()] if self.__group__.strip() != "" else [])
+        if len(where) == 1:
+            clauses += f" WHERE {where[0]}"
+        elif len(where) > 1:
+            clauses += f" WHERE {' AND '.join(f'({w})' for w in where)}"
+        if group_by:
+            clauses += f" GROUP BY {', '.join(self.__column__(c) for c in group_by)}"
+        if self.__order__ and ordered:
+            clauses += f" ORDER BY {', '.join(self.__order__)}"
+        if self.__limit__ != None:
+            clauses += " LIMIT ?"
+        if self.__offset__ != None:
+            clauses += " OFFSET ?"
+        return clauses
+    
+    def __clause_parameters__(self) -> list:
+        parameters: list = self.__where_parameters__ + self.__group_parameters__
+        if self.__limit__ != None:
+            parameters.append(self.__limit__)
+        if self.__offset__ != None:
+            parameters.append(self.__offset__)
+        return parameters
     
     def EXECUTE(self) -> sqlite3.Cursor:
-        return self.__table__.__database__.execute(self.query)
+        if self.__query__.startswith("SELECT"):
+            return self.__table__.__database__.execute(self.query, parameters=self.parameters)
+        result: sqlite3.Cursor = self.__table__.__database__.execute(self.query, True, parameters=self.parameters)
+        self.__table__.__database__.invalidate(self.__table__.name)
+        return result
     
-    def __append__(self, string: str) -> None:
-        self.__handle_group__()
-        self.__query__ += f" {string}"
+    def __column__(self, name: str) -> str:
+        return f"[{self.__alias__}].[{name}]" if self.__alias__ else f"[{name}]"
     
-    def __append_to_group__(self, string: str) -> None:
+    def __append_to_group__(self, string: str, parameters: list = []) -> None:
         self.__group__ += f" {string}"
+        self.__group_parameters__ += parameters
             
     def __handle_group__(self) -> None:
-        if self.__group__ != "":
-            self.__query__ += f" {self.__group__.strip()}"
-            self.__group__ = ""
+        if self.__group__.strip() != "":
+            self.__where__.append(self.__group__.strip())
+            self.__where_parameters__ += self.__group_parameters__
+        self.__group__ = ""
+        self.__group_parameters__ = []
+    
+    def __clone__(self) -> SQLBase[T]:
+        clone: SQLBase[T] = object.__new__(type(self))
+        clone.__copy_from__(self)
+        return clone
+    
+    def __copy_from__(self, sql: SQLBase) -> None:
+        for key, value in vars(sql).items():
+            setattr(self, key, list(value) if type(value) == list else value)
 
 
 class SQLExtension:
@@ -219,66 +1353,347 @@ class SQLExtension:
     @property
     def query(self) -> str:
         return self.__sql__.query
+    
+    @property
+    def parameters(self) -> list:
+        return self.__sql__.parameters
 
 
 class Listable(SQLBase[T], Generic[T]):
+    __terminals__: set[str] = {"TO_LIST", "TO_COLUMNS", "TO_ARROW", "DELETE", "COUNT", "EXISTS", "SUM", "MIN", "MAX", "AVG"}
+
+    def __iter__(self) -> Iterator[T]:
+        return self.ITER()
+    
+    def COUNT(self, column: str = None) -> int:
+        return self.__scalar__("COUNT", column)
+    
+    def EXISTS(self) -> bool:
+        if self.__limit__ == None:
+            command: str = f"SELECT EXISTS (SELECT 1{self.__source__()}{self.__clauses__(False)})"
+        else:
+            command: str = f"SELECT EXISTS ({self.query})"
+        parameters: list = self.parameters
+        with self.__table__.__database__.observe("EXISTS", command, parameters):
+            return self.__table__.__database__.fetch(self.__table__.name, command, parameters)[0][0] == 1
+    
+    def SUM(self, column: str):
+        return self.__scalar__("SUM", column)
+    
+    def MIN(self, column: str):
+        return self.__scalar__("MIN", column)
+    
+    def MAX(self, column: str):
+        return self.__scalar__("MAX", column)
+    
+    def AVG(self, column: str) -> float:
+        return self.__scalar__("AVG", column)
+    
     def TO_LIST(self) -> list[T]:
-        result: list[tuple] = self.EXECUTE().fetchall()
-        self.__table__.__loaded__ = []
-        columns: list[str] = list(self.__column_descriptions__.keys())
-        typed_result: list[T] = []
-        for row in result:
-            obj: AttrObj = AttrObj()
-            for i in range(len(row)):
-                obj[columns[i]] = self.__column_descriptions__[columns[i]].load(row[i])
-            self.__table__.__loaded__.append(TrackedObj(obj))
-            typed_result.append(obj)
-        return typed_result
+        command: str = self.query
+        parameters: list = self.parameters
+        with self.__table__.__database__.observe("TO_LIST", command, parameters) as event:
+            result: list[tuple] = self.__table__.__database__.fetch(self.__sources__(), command, parameters)
+            start: float = time.perf_counter()
+            typed_result: list[T] = self.__load__(result)
+            if event:
+                event.rows = len(result)
+                event.decode_time = time.perf_counter() - start
+            return typed_result
+    
+    def ITER(self, batch_size: int = 1000, track: bool = False) -> Iterator[T]:
+        for rows in self.__table__.__database__.stream_batches(self.query, self.parameters, batch_size, "ITER"):
+            yield from self.__load__(rows, track)
+    
+    def __load__(self, rows: list[tuple], track: bool = True) -> list[T]:
+        loader: RowLoader = self.__table__.__row_loader__(self.__selected__(), self.__lazy__)
+        track = track and (self.__columns__ == None or self.__table__.__primary_key__ in self.__columns__)
+        owner: Table = self.__table__ if track else None
+        identity: weakref.WeakValueDictionary = self.__table__.__identity_map__(loader) if track else None
+        if not self.__joins__:
+            objects: list[T] = [loader.load(row, owner, identity) for row in rows]
+        else:
+            width: int = len(loader.columns)
+            objects: list[T] = [loader.load(row[:width], owner, identity) for row in rows]
+            for name, column, _ in self.__joins__:
+                target, key = self.__relation__(column)
+                target_loader: RowLoader = target.__row_loader__(list(target.__column_descriptions__.keys()))
+                target_owner: Table = target if track else None
+                target_identity: weakref.WeakValueDictionary = target.__identity_map__(target_loader) if track else None
+                end: int = width + len(target_loader.columns)
+                key_index: int = width + target_loader.columns.index(key)
+                for obj, row in zip(objects, rows):
+                    obj.__relate__(name, None if row[key_index] == None else target_loader.load(row[width:end], target_owner, target_identity))
+                width = end
+        for relation, name in self.__prefetches__:
+            self.__prefetch__(objects, relation, name)
+        return objects
+    
+    def __prefetch__(self, objects: list[Row], relation: str, name: str) -> None:
+        if "." in relation:
+            table_name, column = relation.split(".", 1)
+            target: Table = self.__table__.__database__.__tables__.get(table_name)
+            key: str = target.SELECT().__relation__(column)[1]
+            groups: dict = {}
+            for chunk in itertools.batched(dict.fromkeys(o[key] for o in objects if o.get(key) != None), 500):
+                for child in target.SELECT().WHERE().COLUMN(column).IN().VALUES(chunk).TO_LIST():
+                    groups.setdefault(child[column], []).append(child)
+            for obj in objects:
+                obj.__relate__(name, groups.get(obj.get(key), []))
+        else:
+            target, key = self.__relation__(relation)
+            found: dict = {}
+            for chunk in itertools.batched(dict.fromkeys(o[relation] for o in objects if o.get(relation) != None), 500):
+                for child in target.SELECT().WHERE().COLUMN(key).IN().VALUES(chunk).TO_LIST():
+                    found[child[key]] = child
+            for obj in objects:
+                obj.__relate__(name, found.get(obj.get(relation)))
+    
+    def TO_COLUMNS(self, batch_size: int = 10000, numpy: bool = False) -> dict[str, array.array | list]:
+        columns: list[str] = self.__selected__()
+        descriptions: list[ColumnDescription] = [self.__column_descriptions__[c] for c in columns]
+        values: list[array.array | list] = [__column_buffer__(d) for d in descriptions]
+        command: str = self.query
+        parameters: list = self.parameters
+        with self.__table__.__database__.observe("TO_COLUMNS", command, parameters) as event:
+            for rows in self.__table__.__database__.stream_batches(command, parameters, batch_size):
+                for i, column in zip(range(len(values)), zip(*rows)):
+                    filled: int = len(values[i])
+                    try:
+                        values[i].extend(column)
+                    except (TypeError, OverflowError):
+                        del values[i][filled:]
+                        values[i] = values[i].tolist() + list(column)
+            for i, description in enumerate(descriptions):
+                if description.decoder:
+                    values[i] = [description.load(v) for v in values[i]]
+            if event and values:
+                event.rows = len(values[0])
+        if numpy:
+            try:
+                import numpy as np
+            except ImportError:
+                raise ImportError("TO_COLUMNS(numpy=True) requires numpy, install it with pip install model-sqlite[numpy]") from None
+            values = [np.frombuffer(v, dtype=np.int64 if v.typecode == "q" else np.float64) if isinstance(v, array.array) else v for v in values]
+        return dict(zip(columns, values))
+    
+    def TO_ARROW(self, batch_size: int = 10000) -> pyarrow.Table:
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("TO_ARROW requires pyarrow, install it with pip install model-sqlite[arrow]") from None
+        columns: dict[str, array.array | list] = self.TO_COLUMNS(batch_size)
+        arrays: list[pyarrow.Array] = []
+        for values in columns.values():
+            if isinstance(values, array.array):
+                arrays.append(pyarrow.Array.from_buffers(pyarrow.int64() if values.typecode == "q" else pyarrow.float64(), len(values), [None, pyarrow.py_buffer(values)]))
+            else:
+                arrays.append(pyarrow.array(values))
+        return pyarrow.table(arrays, names=list(columns.keys()))
     
     def DELETE(self) -> None:
-        for object in self.TO_LIST():
-            self.__table__.__database__.execute(f"DELETE FROM {self.__table__.name} WHERE {__process_object__(self.__column_descriptions__, object)}", True)
+        name: str = self.__table__.name
+        if self.__limit__ == None:
+            command: str = f"DELETE FROM [{name}] AS [{self.__alias__}]{self.__clauses__(False)}"
+        else:
+            command: str = f"DELETE FROM [{name}] WHERE rowid IN (SELECT {self.__column__('rowid')} FROM [{name}] AS [{self.__alias__}]{self.__clauses__()})"
+        key: str = self.__table__.__primary_key__
+        returning: bool = key != None and len(self.__table__.__identity__) > 0
+        if returning:
+            command += f" RETURNING [{key}]"
+        parameters: list = self.__clause_parameters__()
+        with self.__table__.__database__.observe("DELETE", command, parameters) as event:
+            with self.__table__.__database__.transaction():
+                result: sqlite3.Cursor = self.__table__.__database__.execute(command, True, parameters=parameters)
+                deleted: list[tuple] = result.fetchall() if returning else []
+            if event:
+                event.rows = len(deleted) if returning else result.rowcount
+        self.__table__.__database__.invalidate(name)
+        self.__table__.__evict__(row[0] for row in deleted)
 
 
 class Whereable(Listable[T], Generic[T]):
     def WHERE(self) -> Operation[T]:
         self.__handle_group__()
-        self.__table_number__ += 1
-        self.__query__ = f"SELECT * FROM (\n\t{self.__query__}\n) AS [T{self.__table_number__}] WHERE"
         return Operation(self)
     
     def WHERE_OBJ(self, obj: T) -> Groupable[T]:
-        self.__append__(" WHERE")
-        self.__append_to_group__(__process_object__(self.__column_descriptions__, obj))
+        self.__handle_group__()
+        self.__append_to_group__(*__process_object__(self.__column_descriptions__, obj))
+        return self.__groupable__()
+    
+    def __groupable__(self) -> Groupable[T]:
         return Groupable(self)
     
 
 class Select(Whereable[T], Generic[T]):
+    __terminals__: set[str] = Listable.__terminals__ | {"PAGE_AFTER", "PAGE"}
+    
     def DISTINCT(self) -> Select[T]:
         self.__handle_group__()
-        self.__query__ = "SELECT DISTINCT" + self.__query__.removeprefix("SELECT") 
+        self.__distinct__ = True
+        return self
+    
+    def COLUMNS(self, *columns: str) -> Select[T]:
+        for column in columns:
+            if column not in self.__column_descriptions__:
+                raise InvalidColumns(f"'{column}' is not a column of {self.__table__.name}")
+        self.__columns__ = list(columns)
+        return self
+    
+    def LAZY(self) -> Select[T]:
+        self.__lazy__ = True
         return self
     
     def ORDER_BY(self, column: str, descending: bool = False) -> Select[T]:
         self.__handle_group__()
-        self.__table_number__ += 1
-        self.__query__ = f"SELECT * FROM (\n\t{self.__query__}\n) AS [T{self.__table_number__}] ORDER BY [T{self.__table_number__}].[{column}] {"DESC" if descending else "ASC"}"
+        self.__order__.append(f"{self.__column__(column)} {"DESC" if descending else "ASC"}")
         return self
     
     def LIMIT(self, number: int) -> Limited[T]:
         self.__handle_group__()
-        self.__table_number__ += 1
-        self.__query__ = f"SELECT * FROM (\n\t{self.__query__}\n) AS [T{self.__table_number__}] LIMIT {number}"
+        self.__limit__ = number
         return Limited(self)
+    
+    def JOIN(self, column: str, name: str = None) -> Select[T]:
+        self.__relation__(column)
+        self.__joins__.append((name or __relation_name__(column, self.__column_descriptions__[column].references), column, f"t{len(self.__joins__) + 1}"))
+        return self
+    
+    def PREFETCH(self, relation: str, name: str = None) -> Select[T]:
+        if "." in relation:
+            table_name, column = relation.split(".", 1)
+            target: Table = self.__table__.__database__.__tables__.get(table_name)
+            if target == None:
+                raise InvalidRelation(f"Table '{table_name}' has not been opened on this database")
+            if target.SELECT().__relation__(column)[0] is not self.__table__:
+                raise InvalidRelation(f"'{column}' of {table_name} does not reference {self.__table__.name}")
+            self.__prefetches__.append((relation, name or table_name))
+        else:
+            self.__relation__(relation)
+            self.__prefetches__.append((relation, name or __relation_name__(relation, self.__column_descriptions__[relation].references)))
+        return self
+    
+    def PAGE_AFTER(self, last_row: T | None, size: int, column: str = None, descending: bool = False) -> Page[T]:
+        key: str = self.__keyset_key__()
+        column = column or key
+        if column not in self.__column_descriptions__:
+            raise InvalidColumns(f"'{column}' is not a column of {self.__table__.name}")
+        position: list = None if last_row == None else [self.__column_descriptions__[c].encode(last_row[c]) for c in (column, key)]
+        return self.__page__(column, descending, position, size)
+    
+    def PAGE(self, token: str | None, size: int) -> Page[T]:
+        if token == None:
+            return self.__page__(self.__keyset_key__(), False, None, size)
+        column, descending, position = self.__table__.__database__.read_token(self.__table__.name, token)
+        position = [__from_token_value__(v) for v in position] if type(position) == list else None
+        if column not in self.__column_descriptions__ or type(descending) != bool or position == None or len(position) != 2 or any(type(v) not in (int, float, str, bytes) for v in position):
+            raise InvalidToken("The token does not describe a keyset position")
+        return self.__page__(column, descending, position, size)
+    
+    def SCAN(self, batch_size: int = 1000, column: str = None) -> Iterator[T]:
+        self.__handle_group__()
+        page: Page[T] = self.PAGE_AFTER(None, batch_size, column)
+        yield from page
+        while page.token != None:
+            page = self.PAGE(page.token, batch_size)
+            yield from page
+    
+    def GROUP_BY(self, *columns: str) -> Grouped[T]:
+        self.__handle_group__()
+        for column in columns:
+            if column not in self.__column_descriptions__:
+                raise InvalidColumns(f"'{column}' is not a column of {self.__table__.name}")
+        return Grouped(self, list(columns))
+    
+    def __groupable__(self) -> GroupableSelect[T]:
+        return GroupableSelect(self)
+    
+    def __keyset_key__(self) -> str:
+        if self.__table__.__primary_key__ == None:
+            raise InvalidColumns(f"Keyset pagination needs a primary key on {self.__table__.name}")
+        if self.__order__ or self.__limit__ != None:
+            raise InvalidColumns("Keyset pagination defines its own ORDER BY and LIMIT")
+        return self.__table__.__primary_key__
+    
+    def __page__(self, column: str, descending: bool, position: list | None, size: int) -> Page[T]:
+        key: str = self.__keyset_key__()
+        if column != key and not self.__column_descriptions__[column].not_null:
+            raise InvalidColumns(f"Keyset pagination cannot order by the nullable column '{column}'")
+        query: Listable[T] = self.__clone__()
+        query.__handle_group__()
+        columns: list[str] = [column] if column == key else [column, key]
+        if position != None:
+            comparison: str = "<" if descending else ">"
+            if column == key:
+                query.__append_to_group__(f"{query.__column__(key)} {comparison} ?", [position[1]])
+            else:
+                query.__append_to_group__(f"({query.__column__(column)}, {query.__column__(key)}) {comparison} (?, ?)", position)
+            query.__handle_group__()
+        for c in columns:
+            query.__order__.append(f"{query.__column__(c)} {'DESC' if descending else 'ASC'}")
+        query.__limit__ = size
+        rows: list[T] = query.TO_LIST()
+        token: str = None
+        if len(rows) == size:
+            token = self.__table__.__database__.sign_token(self.__table__.name, [column, descending, [__token_value__(self.__column_descriptions__[c].encode(rows[-1][c])) for c in (column, key)]])
+        return Page(rows, token)
+
+
+class Grouped(SQLExtension, Generic[T]):
+    __terminals__: set[str] = {"TO_LIST"}
+
+    def __init__(self, sql: Select[T], columns: list[str]) -> None:
+        super().__init__(sql)
+        self.__columns__: list[str] = columns
+        self.__aggregates__: list[tuple[str, str]] = []
+    
+    @property
+    def query(self) -> str:
+        projection: list[str] = [self.__sql__.__column__(c) for c in self.__columns__] + [f"{a} AS [{n}]" for n, a in self.__aggregates__]
+        return f"SELECT {', '.join(projection)}{self.__sql__.__source__()}{self.__sql__.__clauses__(group_by=self.__columns__)}"
+    
+    def COUNT(self, column: str = None, alias: str = None) -> Grouped[T]:
+        return self.__aggregate__("COUNT", column, alias)
+    
+    def SUM(self, column: str, alias: str = None) -> Grouped[T]:
+        return self.__aggregate__("SUM", column, alias)
+    
+    def MIN(self, column: str, alias: str = None) -> Grouped[T]:
+        return self.__aggregate__("MIN", column, alias)
+    
+    def MAX(self, column: str, alias: str = None) -> Grouped[T]:
+        return self.__aggregate__("MAX", column, alias)
+    
+    def AVG(self, column: str, alias: str = None) -> Grouped[T]:
+        return self.__aggregate__("AVG", column, alias)
+    
+    def TO_LIST(self) -> list[AttrObj]:
+        command: str = self.query
+        parameters: list = self.parameters
+        with self.__sql__.__table__.__database__.observe("TO_LIST", command, parameters) as event:
+            cursor: sqlite3.Cursor = self.__sql__.__table__.__database__.execute(command, parameters=parameters)
+            columns: list[str] = [d[0] for d in cursor.description]
+            rows: list[AttrObj] = [AttrObj(zip(columns, row)) for row in cursor.fetchall()]
+            if event:
+                event.rows = len(rows)
+            return rows
+    
+    def __aggregate__(self, function: str, column: str, alias: str) -> Grouped[T]:
+        if column != None and column not in self.__sql__.__column_descriptions__:
+            raise InvalidColumns(f"'{column}' is not a column of {self.__sql__.__table__.name}")
+        expression: str = f"{function}({self.__sql__.__column__(column) if column else '*'})"
+        self.__aggregates__.append((alias or (f"{function.lower()}_{column}" if column else function.lower()), expression))
+        return self
 
 
 class Operation(SQLExtension, Generic[T]):
     def COLUMN(self, name: str) -> LeftOperand[T]:
-        self.__sql__.__append_to_group__(f"[T{self.__sql__.__table_number__}].[{name}]")
+        self.__sql__.__append_to_group__(self.__sql__.__column__(name))
         return LeftOperand(self.__sql__)
     
     def VALUE(self, value) -> LeftOperand[T]:
-        self.__sql__.__append_to_group__(__stringify__(value))
+        self.__sql__.__append_to_group__("?", [__to_parameter__(value)])
         return LeftOperand(self.__sql__)
     
     def NULL(self) -> LeftOperand[T]:
@@ -287,7 +1702,7 @@ class Operation(SQLExtension, Generic[T]):
 
     def NOT(self) -> Operation[T]:
         self.__sql__.__append_to_group__("NOT")
-        return Operation(self)
+        return Operation(self.__sql__)
 
 
 class LeftOperand(SQLExtension, Generic[T]):
@@ -321,30 +1736,34 @@ class LeftOperand(SQLExtension, Generic[T]):
 
     def NOT(self) -> LeftOperand[T]:
         self.__sql__.__append_to_group__("NOT")
-        return LeftOperand(self)
+        return LeftOperand(self.__sql__)
 
 
 class Operator(SQLExtension, Generic[T]):
     def COLUMN(self, name: str) -> Groupable[T]:
-        self.__sql__.__append_to_group__(name)
-        return Groupable(self.__sql__)
+        self.__sql__.__append_to_group__(self.__sql__.__column__(name))
+        return self.__sql__.__groupable__()
     
     def VALUE(self, value) -> Groupable[T]:
-        self.__sql__.__append_to_group__(__stringify__(value))
-        return Groupable(self.__sql__)
+        self.__sql__.__append_to_group__("?", [__to_parameter__(value)])
+        return self.__sql__.__groupable__()
     
-    def NULL(self) -> LeftOperand[T]:
+    def NULL(self) -> Groupable[T]:
         self.__sql__.__append_to_group__("NULL")
-        return LeftOperand(self.__sql__)
+        return self.__sql__.__groupable__()
+    
+    def VALUES(self, values: Iterable) -> Groupable[T]:
+        parameters: list = [__to_parameter__(v) for v in values]
+        self.__sql__.__append_to_group__(f"({', '.join('?' for _ in parameters)})", parameters)
+        return self.__sql__.__groupable__()
 
 
 class Groupable(Listable[T], Generic[T]):
     def __init__(self, sql: Listable) -> None:
-        super().__init__(sql.__table__, sql.__column_descriptions__, sql.__query__, sql.__group__, sql.__table_number__)
+        self.__copy_from__(sql)
     
     def GROUP(self) -> Groupable[T]:
-        self.__append__(f"({self.__group__.strip()})")
-        self.__group__ = ""
+        self.__group__ = f"({self.__group__.strip()})"
         return self
     
     def AND(self) -> Operation[T]:
@@ -356,17 +1775,154 @@ class Groupable(Listable[T], Generic[T]):
         return Operation(self)
 
 
+class GroupableSelect(Groupable[T], Select[T], Generic[T]):...
+
+
 class Limited(Listable[T], Generic[T]):
     def __init__(self, sql: SQLBase) -> None:
-        super().__init__(sql.__table__, sql.__column_descriptions__, sql.__query__)
-        self.__group__ = sql.__group__
-        self.__table_number__ = sql.__table_number__
+        self.__copy_from__(sql)
     
     def offset(self, number: int) -> SQLBase[T]:
-        self.__append__(f"OFFSET {number}")
+        self.__offset__ = number
         return self
 
 
+class AsyncDatabase:
+    def __init__(self, filepath: str, **kwargs) -> None:
+        self.__executor__: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-sqlite")
+        self.database: Database = self.__executor__.submit(Database, filepath, **kwargs).result()
+        self.__transaction_lock__: asyncio.Lock = asyncio.Lock()
+        self.__transaction_task__: asyncio.Task = None
+    
+    async def run(self, function: Callable, *args, **kwargs):
+        while self.__transaction_lock__.locked() and self.__transaction_task__ is not asyncio.current_task():
+            async with self.__transaction_lock__:
+                pass
+        return await asyncio.get_running_loop().run_in_executor(self.__executor__, functools.partial(function, *args, **kwargs))
+    
+    async def table(self, name: str, model: type, dont_force_compatibility: bool = False) -> AsyncTable:
+        return AsyncTable(self, await self.run(Table, self.database, name, model, dont_force_compatibility))
+    
+    async def execute(self, command: str, commit: bool = False, vacuum: bool = False, parameters: list | tuple = ()) -> list[tuple]:
+        return await self.run(lambda: self.database.execute(command, commit, vacuum, parameters).fetchall())
+    
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncDatabase]:
+        async with self.__exclusive__(), self.__context__(self.database.transaction()):
+            yield self
+    
+    async def close(self) -> None:
+        await self.run(self.database.close)
+        self.__executor__.shutdown()
+    
+    @asynccontextmanager
+    async def __exclusive__(self) -> AsyncIterator[None]:
+        if self.__transaction_task__ is asyncio.current_task():
+            yield
+            return
+        async with self.__transaction_lock__:
+            self.__transaction_task__ = asyncio.current_task()
+            try:
+                yield
+            finally:
+                self.__transaction_task__ = None
+    
+    @asynccontextmanager
+    async def __context__(self, context) -> AsyncIterator:
+        value = await self.run(context.__enter__)
+        try:
+            yield value
+        except BaseException as e:
+            if not await self.run(context.__exit__, type(e), e, e.__traceback__):
+                raise
+        else:
+            await self.run(context.__exit__, None, None, None)
+
+
+class AsyncTable(Generic[T]):
+    def __init__(self, database: AsyncDatabase, table: Table[T]) -> None:
+        self.__database__: AsyncDatabase = database
+        self.table: Table[T] = table
+        self.name: str = table.name
+    
+    async def is_empty(self) -> bool:
+        return await self.__database__.run(lambda: self.table.is_empty)
+    
+    async def clear(self) -> None:
+        await self.__database__.run(self.table.clear)
+    
+    def SELECT(self) -> AsyncQuery[T]:
+        return AsyncQuery(self.__database__, self.table.SELECT())
+    
+    async def INSERT(self, object: T) -> T:
+        return await self.__database__.run(self.table.INSERT, object)
+    
+    async def INSERT_MANY(self, objects: Iterable[T], chunk_size: int = 1000, return_ids: bool = False) -> list[int] | None:
+        return await self.__database__.run(self.table.INSERT_MANY, objects, chunk_size, return_ids)
+    
+    async def INSERT_OR_IGNORE(self, object: T) -> T | None:
+        return await self.__database__.run(self.table.INSERT_OR_IGNORE, object)
+    
+    async def REPLACE(self, object: T) -> T:
+        return await self.__database__.run(self.table.REPLACE, object)
+    
+    async def UPSERT(self, object: T, conflict_on: str | Iterable[str] = None, update: Iterable[str] = None) -> T:
+        return await self.__database__.run(self.table.UPSERT, object, conflict_on, update)
+    
+    async def UPSERT_MANY(self, objects: Iterable[T], conflict_on: str | Iterable[str] = None, update: Iterable[str] = None, chunk_size: int = 1000, return_rows: bool = False) -> list[T] | None:
+        return await self.__database__.run(self.table.UPSERT_MANY, objects, conflict_on, update, chunk_size, return_rows)
+    
+    def UPDATE(self, object) -> AsyncQuery[T]:
+        return AsyncQuery(self.__database__, self.table.UPDATE(object))
+    
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncTable[T]]:
+        async with self.__database__.__exclusive__(), self.__database__.__context__(self.table.transaction()):
+            yield self
+    
+    async def save_changes(self) -> None:
+        await self.__database__.run(self.table.save_changes)
+
+
+class AsyncQuery(Generic[T]):
+    def __init__(self, database: AsyncDatabase, sql: SQLBase[T] | SQLExtension) -> None:
+        self.__database__: AsyncDatabase = database
+        self.__sql__: SQLBase[T] | SQLExtension = sql
+    
+    def __getattr__(self, name: str):
+        attribute = getattr(self.__sql__, name)
+        if name in getattr(self.__sql__, "__terminals__", ()):
+            return functools.partial(self.__database__.run, attribute)
+        if not callable(attribute):
+            return attribute
+        def builder(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            return AsyncQuery(self.__database__, result) if isinstance(result, (SQLBase, SQLExtension)) else result
+        return builder
+    
+    def __aiter__(self) -> AsyncIterator[T]:
+        return self.ITER()
+    
+    async def EXECUTE(self) -> list[tuple]:
+        return await self.__database__.run(lambda: self.__sql__.EXECUTE().fetchall())
+    
+    async def ITER(self, batch_size: int = 1000, track: bool = False) -> AsyncIterator[T]:
+        async for row in self.__batches__(self.__sql__.ITER(batch_size, track), batch_size):
+            yield row
+    
+    async def SCAN(self, batch_size: int = 1000, column: str = None) -> AsyncIterator[T]:
+        async for row in self.__batches__(self.__sql__.SCAN(batch_size, column), batch_size):
+            yield row
+    
+    async def __batches__(self, rows: Iterator[T], batch_size: int) -> AsyncIterator[T]:
+        try:
+            while batch := await self.__database__.run(lambda: list(itertools.islice(rows, batch_size))):
+                for row in batch:
+                    yield row
+        finally:
+            await self.__database__.run(rows.close)
+
+
 def __fix_string__(string: str) -> str:
     string = string.replace("'", "''")
     return f"'{string}'"
@@ -380,6 +1936,8 @@ def __break_string__(string: str) -> str:
 def __stringify__(data) -> str:
     if type(data) == str:
         return __fix_string__(data)
+    elif type(data) == bytes:
+        return f"X'{data.hex()}'"
     elif type(data) in [dict, list]:
         return __fix_string__(json.dumps(data))
     elif data == None:
@@ -387,12 +1945,19 @@ def __stringify__(data) -> str:
     else:
         return str(data)
 
+def __to_parameter__(data):
+    if type(data) in [dict, list]:
+        return json.dumps(data)
+    return data
+
 def __is_list__(t: type) -> bool:
     return t == list or hasattr(t, "__origin__") and t.__origin__ == list
 
 def __validate_type__(column: type, value: type) -> bool:
     if column == value:
         return True
+    if column == bytes and value in (bytearray, memoryview):
+        return True
     if __is_list__(column) and __is_list__(value):
         return True
     return False
@@ -406,7 +1971,28 @@ def __to_sql_type__(cls: type) -> str:
         return "TEXT"
     return ""
 
+__interpreted__: weakref.WeakKeyDictionary[type, dict[str, ColumnDescription]] = weakref.WeakKeyDictionary()
+
+def register_codec(python_type: type, sql_type: str, encode: Callable, decode: Callable) -> None:
+    CODECS[python_type] = Codec(sql_type, encode, decode)
+    sqlite3.register_adapter(python_type, encode)
+
+def __codec__(cls: type) -> Codec | None:
+    if cls in CODECS:
+        return CODECS[cls]
+    if isinstance(cls, type) and issubclass(cls, Enum):
+        register_codec(cls, "INTEGER" if all(type(m.value) == int for m in cls) else "TEXT", lambda member: member.value, cls)
+        return CODECS[cls]
+    return None
+
+def __dump_binary__(value: dict | list) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+__binary_codec__: Codec = Codec("BLOB", __dump_binary__, json.loads)
+
 def __interpret_class__(cls: type) -> dict:
+    if cls in __interpreted__:
+        return __interpreted__[cls]
     column_descriptions: dict[str, ColumnDescription] = {}
     class_vars: dict = vars(cls)
     for key, value in get_type_hints(cls).items():
@@ -415,13 +2001,82 @@ def __interpret_class__(cls: type) -> dict:
             get_args(value) if get_origin(value) in (Union, types.UnionType) else value,
             class_vars[key] if key in class_vars else None
         )
+    __interpreted__[cls] = column_descriptions
     return column_descriptions
 
-def __process_object__(descriptions: dict[str, ColumnDescription], obj: AttrObj) -> str:
+def __interpret_indexes__(cls: type, column_descriptions: dict[str, ColumnDescription]) -> list[Index]:
+    indexes: list[Index] = []
+    for name, column in column_descriptions.items():
+        if column.indexed or column.unique:
+            indexes.append(Index(name, unique=column.unique))
+    for index in getattr(cls, "__indexes__", []):
+        if type(index) != Index:
+            index = Index(*index)
+        for column in index.columns:
+            if column not in column_descriptions:
+                raise InvalidColumns(f"Index column '{column}' is not a column of {cls.__name__}")
+        indexes.append(index)
+    return indexes
+
+@functools.cache
+def __row_class__(name: str, columns: tuple[str], dumps: tuple[tuple[str, Callable]] = ()) -> type[Row]:
+    json_columns: dict[str, Callable] = dict(dumps)
+    slots: dict[str, str] = {c: f"__column_{c}__" if hasattr(Row, c) or c in json_columns else c for c in columns}
+    row_class: type[Row] = type(f"{name}Row", (Row,), {"__slots__": tuple(slots.values()), "__fields__": columns, "__dumps__": json_columns})
+    row_class.__descriptors__ = {c: row_class.__dict__[slot] for c, slot in slots.items()}
+    for column in json_columns:
+        if not hasattr(Row, column):
+            setattr(row_class, column, property(functools.partial(__read_json__, row_class.__descriptors__[column])))
+    row_class.__arguments__ = (name, columns, dumps)
+    return row_class
+
+def __read_json__(descriptor: types.MemberDescriptorType, row: Row):
+    value = descriptor.__get__(row)
+    if not row.__exposed__:
+        row.__expose__()
+    return value
+
+def __restore_row__(arguments: tuple, values: dict) -> Row:
+    row_class: type[Row] = __row_class__(*arguments)
+    row: Row = row_class.__new__(row_class)
+    row.__reset__()
+    for key, value in values.items():
+        row_class.__descriptors__[key].__set__(row, value)
+    return row
+
+def __relation_name__(column: str, references: type[References]) -> str:
+    return column.removesuffix("_id") if column.endswith("_id") else references.table
+
+def __column_buffer__(description: ColumnDescription) -> array.array | list:
+    if description.not_null and description.type == int:
+        return array.array("q")
+    if description.not_null and description.type == float:
+        return array.array("d")
+    return []
+
+def __token_value__(value):
+    if type(value) in (bytes, bytearray, memoryview):
+        return {"bytes": base64.b64encode(value).decode()}
+    return value
+
+def __from_token_value__(value):
+    if type(value) == dict and type(value.get("bytes")) == str:
+        return base64.b64decode(value["bytes"])
+    return value
+
+def __fingerprint__(column_descriptions: dict[str, ColumnDescription], indexes: dict[str, Index]) -> str:
+    return hashlib.sha1(json.dumps([[c.sql for c in column_descriptions.values()], sorted([n, i.unique] for n, i in indexes.items())]).encode()).hexdigest()
+
+def __combine_fingerprint__(fingerprint: str, digest: str) -> str:
+    return hashlib.sha1(f"{fingerprint}:{digest}".encode()).hexdigest()
+
+def __process_object__(descriptions: dict[str, ColumnDescription], obj: Mapping) -> tuple[str, list]:
     sql: str = ""
+    parameters: list = []
     for key, value in obj.items():
         if key in descriptions:
             if descriptions[key].primary_key:
-                return f"({key} = {__stringify__(value)})"
-            sql += f" AND {key} = {__stringify__(value)}"
-    return f"({sql.removeprefix(" AND ")})"
\ No newline at end of file
+                return f"({key} = ?)", [__to_parameter__(descriptions[key].encode(value))]
+            sql += f" AND {key} {'IS' if value == None else '='} ?"
+            parameters.append(__to_parameter__(descriptions[key].encode(value)))
+    return f"({sql.removeprefix(" AND ")})", parameters
\ No newline at end of file
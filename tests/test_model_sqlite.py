@@ -1,5 +1,9 @@
 from __future__ import annotations
-from model_sqlite import Database, Table, PrimaryKey
+import threading, asyncio, types, enum, base64, json, sqlite3, copy, pickle, importlib.util
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from model_sqlite import Database, Table, PrimaryKey, Indexed, Unique, Index, References, Binary, PoolTimeout, InvalidToken, InvalidColumns, AsyncDatabase, AsyncTable, SlowQueryLog, QueryStats
 
 
 
@@ -162,3 +166,965 @@ def test_model_sqlite():
     # Table is empty
     assert table.SELECT().TO_LIST() == []
     assert table.is_empty == True
+
+
+def test_insert_many():
+    # Insert a generator of rows in chunks
+    # Ensure that every row is stored and the ids are returned in order
+    print("Insert many and check")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    messages = (MessageObj(f"Message {i}", {"index": i}, "Bulk" if i % 2 else None, [str(i)]) for i in range(250))
+    ids: list[int] = table.INSERT_MANY(messages, chunk_size=100, return_ids=True)
+    assert ids == list(range(1, 251))
+    select: list[Message] = table.SELECT().TO_LIST()
+    assert len(select) == 250
+    for i in range(len(select)):
+        assert select[i].id == i + 1
+        assert select[i].message == f"Message {i}"
+        assert select[i].attributes == {"index": i}
+        assert select[i].creator == ("Bulk" if i % 2 else None)
+        assert select[i].viewers == [str(i)]
+    # Insert without returning ids, mixing objects with different columns
+    assert table.INSERT_MANY([Message(), MessageObj("Last")]) == None
+    select = table.SELECT().TO_LIST()
+    assert len(select) == 252
+    assert select[250].message == Message.message
+    assert select[251].message == "Last"
+    # Returned ids come from one multi-row statement per chunk, in input order
+    statements: list[str] = []
+    database.database.set_trace_callback(statements.append)
+    ids = table.INSERT_MANY((MessageObj(f"Chunked {i}") for i in range(250)), chunk_size=100, return_ids=True)
+    database.database.set_trace_callback(None)
+    assert ids == list(range(253, 503))
+    assert len([s for s in statements if s.startswith("INSERT")]) == 3
+    assert table.INSERT_MANY([types.SimpleNamespace(id=i, message="Explicit") for i in (900, 600, 700)], return_ids=True) == [900, 600, 700]
+
+
+def test_parameterized_queries():
+    # Values are bound as parameters instead of pasted into the SQL
+    # Ensure the same query shape is produced for different values
+    print("Parameterized queries")
+    database: Database = Database(":memory:", cached_statements=64)
+    assert database.cached_statements == 64
+    table: Table = Table(database, "messages", Message)
+    table.INSERT(MessageObj("It's a 'quoted' message", {"quote": "'"}, "O'Brien"))
+    table.INSERT(MessageObj("Plain"))
+    first = table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE("O'Brien")
+    second = table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE("Someone else")
+    assert first.query == second.query
+    assert first.parameters == ["O'Brien"]
+    select: list[Message] = first.TO_LIST()
+    assert len(select) == 1
+    assert select[0].message == "It's a 'quoted' message"
+    assert select[0].attributes == {"quote": "'"}
+    assert second.TO_LIST() == []
+    # Update through bound parameters
+    table.UPDATE({"message": "Robert'); DROP TABLE messages;--"}).WHERE_OBJ({"id": 2}).EXECUTE()
+    select = table.SELECT().WHERE().COLUMN("id").EQUALS().VALUE(2).TO_LIST()
+    assert select[0].message == "Robert'); DROP TABLE messages;--"
+
+
+def test_iter():
+    # Stream rows lazily in batches
+    # Ensure that other queries can run while a stream is open
+    print("Iterate and check")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    table.INSERT_MANY(MessageObj(f"Message {i}", {"index": i}) for i in range(25))
+    rows = table.SELECT().ITER(batch_size=10)
+    first: Message = next(rows)
+    assert first.id == 1
+    assert first.attributes == {"index": 0}
+    assert len(table.SELECT().WHERE().COLUMN("id").GREATER_THAN().VALUE(20).TO_LIST()) == 5
+    assert [row.id for row in rows] == list(range(2, 26))
+    assert [row.message for row in table.SELECT().WHERE().COLUMN("id").LESS_THAN().VALUE(3)] == ["Message 0", "Message 1"]
+    # Tracking is optional
+    table.SELECT().TO_LIST()
+    for row in table.SELECT().ITER():
+        row.message = "Untracked"
+    table.save_changes()
+    assert table.SELECT().TO_LIST()[0].message == "Message 0"
+    for row in table.SELECT().ITER(track=True):
+        row.message = "Tracked"
+    table.save_changes()
+    assert all(row.message == "Tracked" for row in table.SELECT())
+
+
+def test_flat_queries():
+    # Chained clauses render a single flat statement
+    # Ensure results match the chained semantics
+    print("Flat queries")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    table.INSERT_MANY(MessageObj(f"Message {i}", creator="Even" if i % 2 == 0 else "Odd") for i in range(10))
+    select = table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE("Even").ORDER_BY("id", True).LIMIT(2).offset(1)
+    projection: str = "SELECT [t0].[id], [t0].[message], [t0].[attributes], [t0].[creator], [t0].[viewers]"
+    assert select.query == f"{projection} FROM [messages] AS [t0] WHERE [t0].[creator] = ? ORDER BY [t0].[id] DESC LIMIT ? OFFSET ?"
+    assert select.parameters == ["Even", 2, 1]
+    assert [row.id for row in select.TO_LIST()] == [7, 5]
+    # Multiple WHERE calls are combined
+    select = table.SELECT().WHERE().COLUMN("id").GREATER_THAN().VALUE(2).OR().COLUMN("id").LESS_THAN().VALUE(0).GROUP().WHERE().COLUMN("creator").EQUALS().VALUE("Odd")
+    assert select.query == f"{projection} FROM [messages] AS [t0] WHERE (([t0].[id] > ? OR [t0].[id] < ?)) AND ([t0].[creator] = ?)"
+    assert [row.id for row in select.TO_LIST()] == [4, 6, 8, 10]
+    # Ordering terms are applied in the order they are chained
+    select = table.SELECT().ORDER_BY("creator").ORDER_BY("id", True)
+    assert [row.id for row in select.TO_LIST()] == [9, 7, 5, 3, 1, 10, 8, 6, 4, 2]
+    # Updates can be filtered with WHERE
+    table.UPDATE({"creator": "Updated"}).WHERE().COLUMN("id").LESS_THAN_EQUALS().VALUE(3).EXECUTE()
+    assert len(table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE("Updated").TO_LIST()) == 3
+
+
+class IndexedMessage:
+    id: int | PrimaryKey = None
+    message: str = ""
+    creator: str | Indexed | None = None
+    slug: str | Unique | None = None
+    viewers: list[str] = []
+    __indexes__ = [("creator", "message")]
+
+class ReindexedMessage:
+    id: int | PrimaryKey = None
+    message: str | Indexed = ""
+    creator: str | None = None
+    slug: str | Unique | None = None
+    viewers: list[str] = []
+    __indexes__ = [Index("creator", "message", unique=True)]
+
+
+def test_indexes():
+    # Declared indexes are created with the table
+    # Ensure filters use them
+    print("Indexes")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", IndexedMessage)
+    assert set(database.get_table_indexes("messages").keys()) == {"ix_messages_creator", "ux_messages_slug", "ix_messages_creator_message"}
+    plan: list[tuple] = database.execute(f"EXPLAIN QUERY PLAN {table.SELECT().WHERE().COLUMN('creator').EQUALS().VALUE('Child').query}", parameters=["Child"]).fetchall()
+    assert "USING INDEX" in plan[0][3]
+    table.INSERT(MessageObj("First", creator="Child"))
+    # Reloading with a changed model reconciles the indexes
+    table = Table(database, "messages", ReindexedMessage)
+    indexes = database.get_table_indexes("messages")
+    assert set(indexes.keys()) == {"ix_messages_message", "ux_messages_slug", "ux_messages_creator_message"}
+    assert indexes["ux_messages_creator_message"].columns == ("creator", "message")
+    assert indexes["ux_messages_creator_message"].unique
+    assert len(table.SELECT().TO_LIST()) == 1
+
+
+def test_dirty_tracking():
+    # Assignments and in-place JSON edits mark only the touched columns
+    # Ensure save_changes writes just those rows and columns
+    print("Dirty tracking")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    table.INSERT_MANY(MessageObj(f"Message {i}", {"index": i}, None, []) for i in range(5))
+    select: list[Message] = table.SELECT().TO_LIST()
+    assert all(row.__changes__() == {} for row in select)
+    select[1].creator = "Assigned"
+    select[3].viewers.append("in place")
+    assert select[1].__changes__() == {"creator": "Assigned"}
+    assert select[3].__changes__() == {"viewers": ["in place"]}
+    statements: list[str] = []
+    database.database.set_trace_callback(statements.append)
+    table.save_changes()
+    database.database.set_trace_callback(None)
+    assert len([s for s in statements if s.startswith("UPDATE")]) == 2
+    assert all(row.__changes__() == {} for row in select)
+    select = table.SELECT().TO_LIST()
+    assert select[1].creator == "Assigned"
+    assert select[3].viewers == ["in place"]
+    assert [row.creator for row in select].count(None) == 4
+    # Only rows whose JSON values were handed out are hashed again on save
+    table = Table(database, "messages", Message)
+    select = table.SELECT().TO_LIST()
+    assert len(table.__exposed__) == 0
+    select[0].message = "Scalar only"
+    viewers = select[4]["viewers"]
+    assert len(table.__exposed__) == 1
+    table.save_changes()
+    viewers.append("after save")
+    table.save_changes()
+    assert table.SELECT().TO_LIST()[4].viewers == ["after save"]
+    assert table.SELECT().TO_LIST()[0].message == "Scalar only"
+
+
+def test_transactions():
+    # Changes inside a transaction are committed together
+    # Ensure failures roll everything back
+    print("Transactions")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    table.INSERT_MANY(MessageObj(f"Message {i}", creator="Even" if i % 2 == 0 else "Odd") for i in range(10))
+    statements: list[str] = []
+    database.database.set_trace_callback(statements.append)
+    with table.transaction():
+        for row in table.SELECT().TO_LIST():
+            row.message = row.message.upper()
+    database.database.set_trace_callback(None)
+    assert statements[-1] == "RELEASE transaction_0"
+    assert len([s for s in statements if s.startswith("UPDATE")]) == 10
+    assert not database.database.in_transaction
+    assert all(row.message.startswith("MESSAGE") for row in table.SELECT())
+    try:
+        with database.transaction():
+            table.INSERT(MessageObj("Rolled back"))
+            with database.transaction():
+                table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE("Odd").DELETE()
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+    assert len(table.SELECT().TO_LIST()) == 10
+    # Deletes run as a single statement
+    statements = []
+    database.database.set_trace_callback(statements.append)
+    table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE("Odd").DELETE()
+    table.SELECT().ORDER_BY("id", True).LIMIT(2).DELETE()
+    database.database.set_trace_callback(None)
+    assert len([s for s in statements if s.startswith("DELETE")]) == 2
+    assert [row.id for row in table.SELECT()] == [1, 3, 5]
+    # Failed or rolled back saves keep their pending changes
+    slugs: Table = Table(database, "slugs", IndexedMessage)
+    slugs.INSERT_MANY(types.SimpleNamespace(message=f"Slug {slug}", slug=slug) for slug in "ab")
+    row = slugs.SELECT().TO_LIST()[1]
+    row.slug = "a"
+    try:
+        slugs.save_changes()
+        assert False
+    except sqlite3.IntegrityError:
+        pass
+    row.slug = "c"
+    slugs.save_changes()
+    assert [r.slug for r in slugs.SELECT().TO_LIST()] == ["a", "c"]
+    try:
+        with database.transaction():
+            row.message = "Rolled back"
+            slugs.save_changes()
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+    assert row.__changes__() == {"message": "Rolled back"}
+    slugs.save_changes()
+    assert slugs.SELECT().TO_LIST()[1].message == "Rolled back"
+    assert slugs.__dirty__ == {}
+
+
+def test_connection_pool(tmp_path):
+    # Reads run on pooled per-thread connections while writes share one writer
+    # Ensure concurrent workers see consistent data
+    print("Connection pool")
+    database: Database = Database(str(tmp_path / "pool.db"), pool_size=4)
+    table: Table = Table(database, "messages", Message)
+    errors: list[Exception] = []
+    readers: set[int] = set()
+
+    def worker(number: int) -> None:
+        try:
+            for i in range(20):
+                table.INSERT_MANY([MessageObj(f"Worker {number} message {i}", creator=f"Worker {number}")])
+                select = table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE(f"Worker {number}").TO_LIST()
+                assert len(select) == i + 1
+            with database.connection() as connection:
+                readers.add(id(connection))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            database.release()
+
+    threads: list[threading.Thread] = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert 0 < len(readers) <= 4
+    assert len(table.SELECT().TO_LIST()) == 80
+    database.close()
+    # Reads only hold a connection while they run, so long-lived threads can outnumber the pool
+    shared: Database = Database(str(tmp_path / "pool.db"), pool_size=2, pool_timeout=0.5)
+    shared_table: Table = Table(shared, "messages", Message)
+    barrier: threading.Barrier = threading.Barrier(4)
+
+    def long_lived() -> None:
+        try:
+            for _ in range(3):
+                assert len(shared_table.SELECT().TO_LIST()) == 80
+                assert len(list(shared_table.SELECT().ITER(batch_size=30))) == 80
+                assert shared.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 80
+                barrier.wait()
+        except Exception as e:
+            errors.append(e)
+            barrier.abort()
+
+    threads = [threading.Thread(target=long_lived) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    # Pool threads loading and editing the same rows share one identity map
+    loaded: list[list] = []
+
+    def editor(number: int) -> None:
+        try:
+            for _ in range(5):
+                rows = shared_table.SELECT().TO_LIST()
+                rows[number].viewers.append(f"Editor {number}")
+                rows[number + 4].message = f"Edited by {number}"
+                loaded.append(rows)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=editor, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert all(all(a is b for a, b in zip(rows, loaded[0])) for rows in loaded)
+    shared_table.save_changes()
+    assert [len(row.viewers) for row in shared_table.SELECT().TO_LIST()[:4]] == [5, 5, 5, 5]
+    assert [row.message for row in shared_table.SELECT().TO_LIST()[4:8]] == [f"Edited by {n}" for n in range(4)]
+    shared.close()
+    # Checking out more connections than the pool holds times out
+    small: Database = Database(str(tmp_path / "pool.db"), pool_size=1, pool_timeout=0.1)
+    outcome: list[Exception] = []
+
+    def blocked() -> None:
+        try:
+            small.execute("SELECT 1")
+        except PoolTimeout as e:
+            outcome.append(e)
+
+    with small.connection():
+        thread: threading.Thread = threading.Thread(target=blocked)
+        thread.start()
+        thread.join()
+    assert len(outcome) == 1
+    thread = threading.Thread(target=blocked)
+    thread.start()
+    thread.join()
+    assert len(outcome) == 1
+    small.close()
+
+
+def test_profiles(tmp_path):
+    # Profiles and custom pragmas are applied to every connection
+    print("Profiles")
+    database: Database = Database(str(tmp_path / "profile.db"), profile="throughput", pragmas={"cache_size": -1024}, pool_size=2)
+    assert database.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert database.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert database.execute("PRAGMA cache_size").fetchone()[0] == -1024
+    assert database.database.execute("PRAGMA temp_store").fetchone()[0] == 2
+    table: Table = Table(database, "messages", Message)
+    table.INSERT_MANY(MessageObj(f"Message {i}") for i in range(100))
+    assert database.checkpoint("TRUNCATE")[0] == 0
+    database.close()
+    # Explicit constructor arguments beat profile defaults
+    for profile in ["default", "throughput", "durable", "compact"]:
+        database = Database(str(tmp_path / "profile.db"), profile=profile, busy_timeout=30, pool_size=1)
+        assert database.database.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+        assert database.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+        database.close()
+    # Incremental auto vacuum replaces full VACUUM when clearing
+    database = Database(str(tmp_path / "compact.db"), profile="compact")
+    table = Table(database, "messages", Message)
+    table.INSERT_MANY(MessageObj("x" * 1000) for i in range(200))
+    pages: int = database.execute("PRAGMA page_count").fetchone()[0]
+    table.clear()
+    assert database.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert database.execute("PRAGMA page_count").fetchone()[0] < pages
+    assert table.is_empty
+    database.close()
+
+
+def test_async_database():
+    # The async front-end runs the same tables and builders on a worker thread
+    print("Async database")
+    async def run() -> None:
+        database: AsyncDatabase = AsyncDatabase(":memory:")
+        table: AsyncTable = await database.table("messages", Message)
+        assert await table.is_empty()
+        inserted: Message = await table.INSERT(MessageObj("First", {"async": True}))
+        assert inserted.id == 1
+        await table.INSERT_MANY(MessageObj(f"Message {i}", creator="Bulk") for i in range(5))
+        select: list[Message] = await table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE("Bulk").ORDER_BY("id", True).TO_LIST()
+        assert [row.id for row in select] == [6, 5, 4, 3, 2]
+        select[0].message = "Changed"
+        await table.save_changes()
+        ids: list[int] = [row.id async for row in table.SELECT().WHERE().COLUMN("message").EQUALS().VALUE("Changed")]
+        assert ids == [6]
+        count: int = 0
+        async for row in table.SELECT().ITER(batch_size=2):
+            count += 1
+        assert count == 6
+        assert [row.id async for row in table.SELECT().SCAN(batch_size=4)] == [1, 2, 3, 4, 5, 6]
+        async with table.transaction():
+            (await table.SELECT().LIMIT(1).TO_LIST())[0].message = "In transaction"
+        assert (await table.SELECT().LIMIT(1).TO_LIST())[0].message == "In transaction"
+        await table.SELECT().WHERE().COLUMN("creator").EQUALS().VALUE("Bulk").DELETE()
+        assert len(await table.SELECT().TO_LIST()) == 1
+        assert await table.SELECT().COUNT() == 1
+        assert await table.SELECT().GROUP_BY("creator").COUNT().TO_LIST() == [{"creator": None, "count": 1}]
+        # A failing transaction in one task does not roll back writes from another task
+        async def failing() -> None:
+            async with database.transaction():
+                await table.INSERT(MessageObj("Rolled back"))
+                await asyncio.sleep(0.05)
+                raise RuntimeError()
+
+        async def concurrent() -> None:
+            await asyncio.sleep(0.01)
+            await table.INSERT(MessageObj("Concurrent"))
+
+        outcome = await asyncio.gather(failing(), concurrent(), return_exceptions=True)
+        assert type(outcome[0]) == RuntimeError and outcome[1] == None
+        assert [row.message for row in await table.SELECT().ORDER_BY("id").TO_LIST()][1:] == ["Concurrent"]
+        await database.close()
+    asyncio.run(run())
+
+
+def test_columns_and_lazy():
+    # Projection loads only the requested columns
+    # Lazy rows decode JSON columns on first access
+    print("Columns and lazy loading")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    table.INSERT_MANY(MessageObj(f"Message {i}", {"index": i}, None, [str(i)]) for i in range(3))
+    select: list[Message] = table.SELECT().COLUMNS("id", "message").WHERE().COLUMN("id").GREATER_THAN().VALUE(1).TO_LIST()
+    assert select == [{"id": 2, "message": "Message 1"}, {"id": 3, "message": "Message 2"}]
+    select[0].message = "Projected"
+    table.save_changes()
+    assert table.SELECT().COLUMNS("message").WHERE().COLUMN("id").EQUALS().VALUE(2).TO_LIST()[0].message == "Projected"
+    # Rows projected without the primary key cannot be matched back, so they are not saved
+    projected = table.SELECT().COLUMNS("message", "viewers").TO_LIST()
+    projected[0].message = "Untracked"
+    projected[1].viewers.append("untracked")
+    table.save_changes()
+    assert [row.message for row in table.SELECT().TO_LIST()] == ["Message 0", "Projected", "Message 2"]
+    assert table.SELECT().TO_LIST()[1].viewers == ["1"]
+    select = table.SELECT().LAZY().TO_LIST()
+    assert set(select[0].__raw__.keys()) == {"attributes", "viewers"}
+    assert "attributes" in select[0] and len(select[0]) == 5
+    assert select[0].attributes == {"index": 0}
+    assert set(select[0].__raw__.keys()) == {"viewers"}
+    assert select[1] == {"id": 2, "message": "Projected", "attributes": {"index": 1}, "creator": None, "viewers": ["1"]}
+    select[2].viewers.append("lazy")
+    table.save_changes()
+    assert table.SELECT().TO_LIST()[2].viewers == ["2", "lazy"]
+
+
+def test_rows():
+    # Rows are compact generated classes that keep attribute and mapping access
+    print("Rows")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    table.INSERT(MessageObj("First", {"a": 1}))
+    row: Message = table.SELECT().TO_LIST()[0]
+    assert type(row).__name__ == "MessageRow"
+    assert not hasattr(row, "__dict__")
+    assert row.message == row["message"] == "First"
+    assert dict(row) == {"id": 1, "message": "First", "attributes": {"a": 1}, "creator": None, "viewers": []}
+    assert list(row.keys()) == ["id", "message", "attributes", "creator", "viewers"]
+    row["creator"] = "Keyed"
+    assert row.__changes__() == {"creator": "Keyed"}
+    try:
+        row.unknown = 1
+        assert False
+    except AttributeError:
+        pass
+    projected = table.SELECT().COLUMNS("id").TO_LIST()[0]
+    assert len(projected) == 1 and "message" not in projected
+    # Rows copy, pickle and serialize like the dicts they replace
+    row = table.SELECT().LAZY().TO_LIST()[0]
+    assert json.loads(json.dumps(dict(row))) == row
+    assert row.copy() == row and type(row.copy()) == dict
+    for duplicate in [copy.copy(row), copy.deepcopy(row), pickle.loads(pickle.dumps(row))]:
+        assert type(duplicate) == type(row) and duplicate == row and duplicate is not row
+        assert duplicate.__changes__() == {}
+    assert copy.deepcopy(row).attributes is not row.attributes
+    # Columns named like mapping methods are reached by key and leave the methods intact
+    orders: Table = Table(database, "orders", Order)
+    orders.INSERT(types.SimpleNamespace(items=["a"], keys=2, get="x"))
+    order = orders.SELECT().LAZY().TO_LIST()[0]
+    assert order == {"id": 1, "items": ["a"], "keys": 2, "get": "x"}
+    assert repr(order) == "{'id': 1, 'items': ['a'], 'keys': 2, 'get': 'x'}"
+    assert list(order.keys()) == ["id", "items", "keys", "get"] and order.get("keys") == 2
+    order["items"].append("b")
+    order.keys = 3
+    orders.save_changes()
+    assert database.execute("SELECT items, keys FROM orders").fetchone() == ('["a", "b"]', 3)
+
+
+class Order:
+    id: int | PrimaryKey = None
+    items: list[str] = []
+    keys: int = 0
+    get: str = ""
+
+
+class Score:
+    id: int | PrimaryKey = None
+    player: str = ""
+    points: int = 0
+
+    def __init__(self, player: str = "", points: int = 0) -> None:
+        self.player = player
+        self.points = points
+
+
+def test_aggregates():
+    # Counts, sums and groups are computed by SQLite
+    print("Aggregates")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "scores", Score)
+    assert table.is_empty
+    assert table.SELECT().COUNT() == 0
+    assert not table.SELECT().EXISTS()
+    table.INSERT_MANY(Score(p, n) for p, n in [("a", 3), ("b", 5), ("a", 7), ("c", 1), ("b", 2)])
+    assert not table.is_empty
+    assert table.SELECT().COUNT() == 5
+    assert table.SELECT().WHERE().COLUMN("player").EQUALS().VALUE("a").COUNT() == 2
+    assert table.SELECT().WHERE().COLUMN("player").EQUALS().VALUE("z").EXISTS() == False
+    assert table.SELECT().SUM("points") == 18
+    assert table.SELECT().MIN("points") == 1
+    assert table.SELECT().MAX("points") == 7
+    assert table.SELECT().WHERE().COLUMN("player").EQUALS().VALUE("b").AVG("points") == 3.5
+    assert table.SELECT().ORDER_BY("points", True).LIMIT(2).SUM("points") == 12
+    assert table.SELECT().COLUMNS("player").DISTINCT().COUNT() == 3
+    groups = table.SELECT().WHERE().COLUMN("points").GREATER_THAN().VALUE(1).ORDER_BY("player").GROUP_BY("player").COUNT().SUM("points", "total").TO_LIST()
+    assert groups == [{"player": "a", "count": 2, "total": 10}, {"player": "b", "count": 2, "total": 7}]
+    assert groups[0].total == 10
+
+
+class Keyless:
+    name: str = ""
+
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+
+
+def test_keyset_pagination():
+    # Pages continue from the last row instead of skipping with OFFSET
+    print("Keyset pagination")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "scores", Score)
+    table.INSERT_MANY(Score(f"player {i}", i % 4) for i in range(10))
+    page = table.SELECT().PAGE_AFTER(None, 4)
+    assert [row.id for row in page] == [1, 2, 3, 4]
+    page = table.SELECT().PAGE_AFTER(page.rows[-1], 4)
+    assert [row.id for row in page] == [5, 6, 7, 8]
+    page = table.SELECT().PAGE(page.token, 4)
+    assert [row.id for row in page] == [9, 10]
+    assert page.token == None
+    # Ordering by a non-unique column breaks ties with the primary key
+    scoring = lambda: table.SELECT().WHERE().COLUMN("points").GREATER_THAN().VALUE(0)
+    page = scoring().PAGE_AFTER(None, 3, "points", True)
+    ids: list[int] = [row.id for row in page]
+    while page.token != None:
+        page = scoring().PAGE(page.token, 3)
+        ids += [row.id for row in page]
+    assert ids == [8, 4, 7, 3, 10, 6, 2]
+    # Paging leaves the builder untouched so it can be paged again
+    query = scoring()
+    sql: str = query.query
+    first: list[int] = [row.id for row in query.PAGE_AFTER(None, 3, "points", True)]
+    assert query.query == sql
+    assert [row.id for row in query.PAGE(query.PAGE_AFTER(None, 3, "points", True).token, 3)] == [3, 10, 6]
+    assert first == [8, 4, 7]
+    # Tokens are signed, so a crafted position or column is rejected
+    token: str = scoring().PAGE_AFTER(None, 3, "points", True).token
+    payload: str = base64.urlsafe_b64encode(json.dumps(["points] || (SELECT 1/0) || [points", True, [1, 1]]).encode()).decode()
+    for forged in [payload + token[token.index("."):], payload, "not a token"]:
+        try:
+            scoring().PAGE(forged, 3)
+            assert False
+        except InvalidToken:
+            pass
+    # Tokens only survive across databases that share an explicit secret
+    token = None
+    for secret, valid in [(b"shared", True), (b"shared", True), (b"other", False), (None, False)]:
+        other: Table = Table(Database(":memory:", token_secret=secret), "scores", Score)
+        other.INSERT_MANY(Score(f"player {i}", i) for i in range(4))
+        token = token or other.SELECT().PAGE_AFTER(None, 1).token
+        try:
+            assert [row.id for row in other.SELECT().PAGE(token, 2)] == [2, 3]
+            assert valid
+        except InvalidToken:
+            assert not valid
+    # Full scans run in keyset batches
+    assert [row.id for row in table.SELECT().SCAN(batch_size=3)] == list(range(1, 11))
+    assert [row.id for row in table] == list(range(1, 11))
+    # Nullable sort columns are rejected and tables without a primary key iterate plainly
+    messages: Table = Table(database, "messages", Message)
+    messages.INSERT_MANY(MessageObj(f"Message {i}", creator=None if i % 2 else "Child") for i in range(6))
+    try:
+        list(messages.SELECT().SCAN(batch_size=2, column="creator"))
+        assert False
+    except InvalidColumns:
+        pass
+    keyless: Table = Table(database, "keyless", Keyless)
+    keyless.INSERT_MANY(Keyless(f"Tag {i}") for i in range(3))
+    assert [row.name for row in keyless] == ["Tag 0", "Tag 1", "Tag 2"]
+
+
+def test_query_cache():
+    # Repeated reads are served from the cache until a write touches the table
+    print("Query cache")
+    database: Database = Database(":memory:", cache_size=2)
+    table: Table = Table(database, "scores", Score)
+    other: Table = Table(database, "messages", Message)
+    table.INSERT_MANY(Score(f"player {i}", i) for i in range(5))
+    top = lambda: table.SELECT().WHERE().COLUMN("points").GREATER_THAN().VALUE(2).TO_LIST()
+    assert [row.points for row in top()] == [3, 4]
+    assert [row.points for row in top()] == [3, 4]
+    assert database.cache.hits == 1 and database.cache.misses == 1
+    other.INSERT(MessageObj("hello"))
+    top()
+    assert database.cache.hits == 2
+    row = table.SELECT().WHERE().COLUMN("points").EQUALS().VALUE(4).TO_LIST()[0]
+    row.points = 10
+    table.save_changes()
+    assert [row.points for row in top()] == [3, 10]
+    assert database.cache.misses == 3
+    table.SELECT().WHERE().COLUMN("points").EQUALS().VALUE(3).DELETE()
+    assert table.SELECT().COUNT() == 4
+    table.clear()
+    assert table.SELECT().COUNT() == 0
+    # The least recently used entry is evicted once the cache is full
+    database.cache.invalidate()
+    evictions: int = database.cache.evictions
+    for points in range(3):
+        table.SELECT().WHERE().COLUMN("points").EQUALS().VALUE(points).TO_LIST()
+    assert database.cache.evictions == evictions + 1
+    assert database.cache.stats["size"] == 2
+    # Reads inside a rolled back transaction never reach the cache
+    try:
+        with database.transaction():
+            table.INSERT(Score("ghost", 1))
+            assert table.SELECT().COUNT() == 1
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert table.SELECT().COUNT() == 0
+
+
+def test_identity_map():
+    # Loading the same primary key twice yields the same object
+    print("Identity map")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    table.INSERT_MANY([MessageObj("First", {"a": 1}), MessageObj("Second")])
+    first = table.SELECT().WHERE().COLUMN("id").EQUALS().VALUE(1).TO_LIST()[0]
+    attributes = first.attributes
+    assert table.SELECT().TO_LIST()[0] is first
+    assert first.attributes is attributes
+    # Pending changes from earlier queries survive later loads and still get saved
+    first.message = "Changed"
+    first.attributes["b"] = 2
+    second = table.SELECT().WHERE().COLUMN("id").EQUALS().VALUE(2).TO_LIST()[0]
+    second.viewers.append("Dominic")
+    assert table.SELECT().TO_LIST()[0].message == "Changed"
+    table.save_changes()
+    rows = database.execute("SELECT message, attributes, viewers FROM messages").fetchall()
+    assert rows == [("Changed", '{"a": 1, "b": 2}', '[]'), ("Second", '{}', '["Dominic"]')]
+    # Changes made elsewhere are picked up on the next load
+    database.execute("UPDATE messages SET message = 'External', attributes = '{\"c\": 3}' WHERE id = 1", True)
+    assert table.SELECT().TO_LIST()[0] is first
+    assert first.message == "External" and first.attributes == {"c": 3}
+    # Deleting other rows keeps loaded rows and their pending edits
+    table.INSERT(MessageObj("Third"))
+    first.viewers.append("kept")
+    table.SELECT().WHERE().COLUMN("id").EQUALS().VALUE(3).DELETE()
+    assert len(table.__identity__) == 2
+    table.save_changes()
+    assert table.SELECT().TO_LIST()[0] is first
+    assert database.execute("SELECT viewers FROM messages WHERE id = 1").fetchone()[0] == '["kept"]'
+    # Rows are only held weakly
+    del first, second, attributes
+    assert len(table.__identity__) == 0
+
+
+def test_instrumentation():
+    # Terminals report one event covering the statement and row decoding
+    print("Instrumentation")
+    database: Database = Database(":memory:", cache_size=8)
+    table: Table = Table(database, "scores", Score)
+    events: list = []
+    database.add_hook(events.append)
+    table.INSERT_MANY(Score(f"player {i}", i) for i in range(5))
+    assert [(e.terminal, e.rows) for e in events] == [("execute_many", 5)]
+    events.clear()
+    query = lambda: table.SELECT().WHERE().COLUMN("points").GREATER_THAN().VALUE(1).TO_LIST()
+    query()
+    query()
+    assert [e.terminal for e in events] == ["TO_LIST", "TO_LIST"]
+    assert events[0].rows == 3 and events[0].decode_time != None and events[0].parameters == [1]
+    assert not events[0].cached and events[1].cached
+    table.SELECT().COUNT()
+    table.SELECT().WHERE().COLUMN("points").EQUALS().VALUE(0).DELETE()
+    assert [(e.terminal, e.rows) for e in events[2:]] == [("COUNT", 1), ("DELETE", 1)]
+    # Streaming and grouped reads are reported too, and failed statements carry their error
+    events.clear()
+    assert len(list(table.SELECT().ITER(batch_size=2))) == 4
+    table.SELECT().GROUP_BY("player").COUNT().TO_LIST()
+    try:
+        database.execute("SELECT missing FROM scores")
+        assert False
+    except sqlite3.OperationalError:
+        pass
+    assert [(e.terminal, e.rows) for e in events] == [("ITER", 4), ("TO_LIST", 4), ("execute", None)]
+    assert events[0].error == None and type(events[2].error) == sqlite3.OperationalError
+    database.remove_hook(events.append)
+    # The slow query log can capture query plans and shapes aggregate statistics
+    slow: SlowQueryLog = SlowQueryLog(threshold=0, explain=True)
+    stats: QueryStats = QueryStats()
+    database.add_hook(slow)
+    database.add_hook(stats)
+    table.SELECT().WHERE().COLUMN("points").EQUALS().VALUE(2).TO_LIST()
+    table.SELECT().WHERE().COLUMN("points").EQUALS().VALUE(3).TO_LIST()
+    assert slow.entries[0].plan == ["SCAN t0"]
+    exported = stats.export()
+    assert len(exported) == 1 and exported[0]["count"] == 2 and exported[0]["rows"] == 2
+    slow.threshold = 60
+    try:
+        table.SELECT().WHERE().COLUMN("missing").EQUALS().VALUE(1).TO_LIST()
+        assert False
+    except sqlite3.OperationalError:
+        pass
+    assert slow.entries[-1].error != None and slow.entries[-1].plan == None
+    assert sum(shape["errors"] for shape in stats.export()) == 1
+
+
+class Player:
+    id: int | PrimaryKey = None
+    name: str = ""
+    points: int = 0
+    rank: str = "bronze"
+
+
+class RenamedPlayer:
+    id: int | PrimaryKey = None
+    name: str = ""
+    score: float = 0.0
+    level: int = 1
+
+
+def test_schema_sync(tmp_path):
+    # Unchanged tables skip reconciliation after a schema_version check
+    print("Schema sync")
+    path: str = str(tmp_path / "schema.db")
+    database: Database = Database(path)
+    table: Table = Table(database, "players", Player)
+    table.INSERT_MANY([types.SimpleNamespace(name="Ada"), types.SimpleNamespace(name="Grace")])
+    database.execute("CREATE INDEX by_name ON players (name)", True)
+    database = Database(path)
+    table = Table(database, "players", Player)
+    assert table.SELECT().COUNT() == 2
+    statements: list[str] = []
+    database.database.set_trace_callback(statements.append)
+    table = Table(database, "players", Player)
+    database.database.set_trace_callback(None)
+    assert statements == ["PRAGMA schema_version"]
+    # A matching database without stored fingerprints is opened without writing
+    database.execute("DROP TABLE model_sqlite_schema", True)
+    database = Database(path)
+    statements = []
+    database.database.set_trace_callback(statements.append)
+    table = Table(database, "players", Player)
+    database.database.set_trace_callback(None)
+    assert not any(s.startswith(("CREATE", "INSERT", "ALTER", "DROP")) for s in statements)
+    assert database.execute("SELECT name FROM sqlite_master WHERE name = 'model_sqlite_schema'").fetchone() == None
+    # Several changed columns rebuild the table once, keeping data and unmanaged indexes
+    table = Table(database, "players", RenamedPlayer)
+    assert [c[1] for c in database.get_table_columns("players")] == ["id", "name", "score", "level"]
+    assert [(row.name, row.level) for row in table.SELECT().TO_LIST()] == [("Ada", 1), ("Grace", 1)]
+    assert "by_name" in database.get_table_indexes("players")
+    # Changes made outside the library are detected through the stored fingerprint
+    database.execute("ALTER TABLE players DROP COLUMN level", True)
+    table = Table(database, "players", RenamedPlayer)
+    assert [c[1] for c in database.get_table_columns("players")] == ["id", "name", "score", "level"]
+    assert table.SELECT().COUNT() == 2
+
+
+def test_columns_export():
+    # Columnar export fills typed arrays straight from the cursor
+    print("Columnar export")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "messages", Message)
+    table.INSERT_MANY(MessageObj(f"Message {i}", {"index": i}, None if i % 2 else "Child", ["a"] * i) for i in range(5))
+    columns = table.SELECT().WHERE().COLUMN("id").GREATER_THAN().VALUE(1).TO_COLUMNS(batch_size=2)
+    assert list(columns.keys()) == ["id", "message", "attributes", "creator", "viewers"]
+    assert columns["id"].typecode == "q" and columns["id"].tolist() == [2, 3, 4, 5]
+    assert columns["message"] == ["Message 1", "Message 2", "Message 3", "Message 4"]
+    assert columns["attributes"][0] == {"index": 1}
+    assert columns["creator"] == [None, "Child", None, "Child"]
+    scores: Table = Table(database, "scores", Score)
+    scores.INSERT_MANY(Score(f"player {i}", i) for i in range(3))
+    assert scores.SELECT().COLUMNS("points").TO_COLUMNS()["points"].tolist() == [0, 1, 2]
+    # A value the typed array cannot hold falls back to a list without duplicates
+    database.execute("INSERT INTO scores (player, points) VALUES ('player 3', 2.5)", True)
+    assert scores.SELECT().COLUMNS("points").TO_COLUMNS(batch_size=3)["points"] == [0, 1, 2, 2.5]
+    assert scores.SELECT().COLUMNS("points").TO_COLUMNS()["points"] == [0, 1, 2, 2.5]
+    # Arrow export needs the optional extra
+    if importlib.util.find_spec("pyarrow") == None:
+        try:
+            scores.SELECT().TO_ARROW()
+            assert False
+        except ImportError:
+            pass
+
+
+def test_arrow_export():
+    # Arrow tables are built from the same columnar export
+    print("Arrow export")
+    pytest.importorskip("pyarrow")
+    database: Database = Database(":memory:")
+    scores: Table = Table(database, "scores", Score)
+    scores.INSERT_MANY(Score(f"player {i}", i) for i in range(3))
+    assert scores.SELECT().TO_ARROW().column("points").to_pylist() == [0, 1, 2]
+
+
+class Author:
+    id: int | PrimaryKey = None
+    name: str = ""
+
+
+class Post:
+    id: int | PrimaryKey = None
+    title: str = ""
+    author_id: int | References["authors"] | None = None
+
+
+def test_relationships():
+    # Reference markers emit foreign keys
+    print("Relationships")
+    database: Database = Database(":memory:")
+    authors: Table = Table(database, "authors", Author)
+    posts: Table = Table(database, "posts", Post)
+    assert "REFERENCES authors" in database.execute("SELECT sql FROM sqlite_master WHERE name = 'posts'").fetchone()[0]
+    authors.INSERT_MANY([types.SimpleNamespace(name="Ada"), types.SimpleNamespace(name="Grace")])
+    posts.INSERT_MANY([types.SimpleNamespace(title=f"Post {i}", author_id=i % 2 + 1) for i in range(4)] + [types.SimpleNamespace(title="Orphan")])
+    # A joined query loads parents and their references together
+    statements: list[str] = []
+    database.database.set_trace_callback(statements.append)
+    rows = posts.SELECT().JOIN("author_id").TO_LIST()
+    assert len(statements) == 1 and "LEFT JOIN [authors] AS [t1]" in statements[0]
+    assert [row.author.name if row.author else None for row in rows] == ["Ada", "Grace", "Ada", "Grace", None]
+    assert rows[0].author is rows[2].author
+    # Prefetching runs one IN query per relation, in either direction
+    statements.clear()
+    rows = posts.SELECT().PREFETCH("author_id", "writer").TO_LIST()
+    assert len(statements) == 2 and statements[1].endswith("IN (1, 2)")
+    assert rows[1].writer.name == "Grace" and rows[4].writer == None
+    statements.clear()
+    people = authors.SELECT().PREFETCH("posts.author_id").TO_LIST()
+    database.database.set_trace_callback(None)
+    assert len(statements) == 2
+    assert [[post.title for post in person.posts] for person in people] == [["Post 0", "Post 2"], ["Post 1", "Post 3"]]
+
+
+class Status(enum.Enum):
+    DRAFT = 1
+    PUBLISHED = 2
+
+
+class Document:
+    id: int | PrimaryKey = None
+    status: Status = Status.DRAFT
+    created: datetime | None = None
+    price: Decimal = Decimal("0.00")
+    payload: bytes | None = None
+    body: dict | Binary = {}
+
+
+def test_codecs():
+    # Typed columns round trip through their codecs
+    print("Codecs")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "documents", Document)
+    columns = {c[1]: (c[2], c[4]) for c in database.get_table_columns("documents")}
+    assert columns["status"] == ("INTEGER", "1") and columns["price"] == ("TEXT", "'0.00'")
+    assert columns["payload"][0] == "BLOB" and columns["body"] == ("BLOB", "X'7b7d'")
+    created: datetime = datetime(2024, 5, 1, 12, 30)
+    table.INSERT(types.SimpleNamespace(status=Status.PUBLISHED, created=created, price=Decimal("19.99"), payload=memoryview(b"\x00\x01"), body={"tags": ["a"], "count": 1}))
+    row = table.SELECT().WHERE().COLUMN("created").EQUALS().VALUE(created).TO_LIST()[0]
+    assert row.status is Status.PUBLISHED and row.created == created and row.price == Decimal("19.99")
+    assert row.payload == b"\x00\x01" and row.body == {"tags": ["a"], "count": 1}
+    assert database.execute("SELECT body FROM documents").fetchone()[0] == b'{"tags":["a"],"count":1}'
+    # Binary JSON columns keep in-place change tracking
+    row.body["count"] = 2
+    row.status = Status.DRAFT
+    table.save_changes()
+    assert database.execute("SELECT status, body FROM documents").fetchone() == (1, b'{"tags":["a"],"count":2}')
+    assert table.SELECT().TO_LIST()[0].__changes__() == {}
+    # Decimals compare numerically and every codec column can drive keyset pagination
+    entries: Table = Table(database, "entries", Entry)
+    entries.INSERT_MANY(Entry(Decimal(i * 3), datetime(2024, 1, 1 + i), bytes([i])) for i in range(6))
+    assert [row.amount for row in entries.SELECT().WHERE().COLUMN("amount").GREATER_THAN().VALUE(Decimal("5")).TO_LIST()] == [6, 9, 12, 15]
+    assert [row.amount for row in entries.SELECT().ORDER_BY("amount").TO_LIST()] == [0, 3, 6, 9, 12, 15]
+    assert entries.SELECT().MAX("amount") == Decimal("15") and entries.SELECT().MIN("at") == datetime(2024, 1, 1)
+    # Decimals keep their exact digits and scale
+    for amount in [Decimal("12345678901234567.89"), Decimal("1.10"), Decimal("-0.000000000000000000001")]:
+        stored = entries.INSERT(Entry(amount, datetime(2025, 1, 1), b"x"))
+        assert str(entries.SELECT().COLUMNS("id", "amount").WHERE().COLUMN("id").EQUALS().VALUE(stored.id).TO_LIST()[0].amount) == str(amount)
+    assert entries.SELECT().WHERE().COLUMN("amount").EQUALS().VALUE(Decimal("1.1")).COUNT() == 1
+    assert entries.SELECT().MAX("amount") == Decimal("12345678901234567.89")
+    entries.SELECT().WHERE().COLUMN("digest").EQUALS().VALUE(b"x").DELETE()
+    for column in ["amount", "at", "digest"]:
+        page = entries.SELECT().PAGE_AFTER(None, 4, column, True)
+        ids: list[int] = [row.id for row in page]
+        page = entries.SELECT().PAGE(page.token, 4)
+        assert ids + [row.id for row in page] == [6, 5, 4, 3, 2, 1]
+
+
+class Entry:
+    id: int | PrimaryKey = None
+    amount: Decimal = Decimal("0")
+    at: datetime = datetime(2000, 1, 1)
+    digest: bytes = b""
+
+    def __init__(self, amount: Decimal, at: datetime, digest: bytes) -> None:
+        self.amount = amount
+        self.at = at
+        self.digest = digest
+
+
+class Account:
+    id: int | PrimaryKey = None
+    email: str | Unique = ""
+    name: str = ""
+    logins: int = 0
+
+
+def test_upsert():
+    # Upserts insert or update in one statement and return the stored row
+    print("Upsert")
+    database: Database = Database(":memory:")
+    table: Table = Table(database, "accounts", Account)
+    first = table.UPSERT(types.SimpleNamespace(email="ada@example.com", name="Ada", logins=1), conflict_on="email")
+    assert first.id == 1 and first.logins == 1
+    statements: list[str] = []
+    database.database.set_trace_callback(statements.append)
+    second = table.UPSERT(types.SimpleNamespace(email="ada@example.com", name="Ada L.", logins=2), conflict_on="email", update=["logins"])
+    database.database.set_trace_callback(None)
+    assert len([s for s in statements if s.startswith("INSERT")]) == 1
+    assert second is first and second.id == 1 and second.logins == 2 and second.name == "Ada"
+    # Batches go through executemany unless the rows are requested back
+    table.UPSERT_MANY([types.SimpleNamespace(email=f"user{i}@example.com", name=f"User {i}") for i in range(3)], conflict_on="email")
+    table.UPSERT_MANY([types.SimpleNamespace(email=f"user{i}@example.com", name=f"Renamed {i}") for i in range(2)], conflict_on="email")
+    rows = table.UPSERT_MANY([types.SimpleNamespace(id=1, email="ada@example.com", name="Ada", logins=3)], return_rows=True)
+    assert rows[0] is first and first.logins == 3
+    assert [row.name for row in table.SELECT().TO_LIST()] == ["Ada", "Renamed 0", "Renamed 1", "User 2"]
+    # Ignore and replace variants
+    assert table.INSERT_OR_IGNORE(types.SimpleNamespace(email="ada@example.com", name="Duplicate")) == None
+    replaced = table.REPLACE(types.SimpleNamespace(id=4, email="user2@example.com", name="Replaced"))
+    assert replaced.name == "Replaced" and replaced.logins == 0
+    assert table.SELECT().COUNT() == 4
+    # Rows removed by a replace conflict leave the identity map with their pending edits
+    stale = table.SELECT().WHERE().COLUMN("email").EQUALS().VALUE("user1@example.com").TO_LIST()[0]
+    stale.name = "Stale"
+    moved = table.REPLACE(types.SimpleNamespace(id=10, email="user1@example.com", name="Moved"))
+    assert stale.id not in table.__identity__ and id(stale) not in table.__dirty__
+    table.save_changes()
+    assert table.SELECT().WHERE().COLUMN("email").EQUALS().VALUE("user1@example.com").TO_LIST() == [moved]
+    assert moved.name == "Moved" and table.SELECT().COUNT() == 4